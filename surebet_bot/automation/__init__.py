@@ -1,7 +1,7 @@
 # automation/ - Automatisation inscription The Odds API
 #
 # Modules:
-#   telegram_relay   - Communication Telegram (synchrone, requests)
+#   telegram_relay   - Communication Telegram (requests + variantes async aiohttp)
 #   mail_tm          - Emails temporaires Mail.tm
 #   captcha_handler  - Résolution captcha (auto + audio autonome + relay Telegram)
 #   registration     - Inscription sur the-odds-api.com
@@ -14,6 +14,7 @@ import time
 import tempfile
 
 from automation.telegram_relay import (
+    TG_SESSION,
     send_telegram_message,
     send_telegram_photo,
     send_telegram_audio,
@@ -26,26 +27,36 @@ from automation.audio_solver import solve_audio_captcha
 CAPTCHA_TEMP_DIR = os.path.join(os.path.dirname(__file__), "..", "captcha_temp")
 os.makedirs(CAPTCHA_TEMP_DIR, exist_ok=True)
 
+# Long polling de l'attente du code audio (secondes)
+AUDIO_POLL_TIMEOUT = 10
+
 
 # ============================================================
 # Détection
 # ============================================================
 
+# Premier token reCAPTCHA valide parmi les champs connus (un seul aller-retour CDP)
+_JS_RECAPTCHA_TOKEN = """() => {
+    for (const s of ['#g-recaptcha-response-2', '#g-recaptcha-response',
+                     'textarea[name="g-recaptcha-response"]']) {
+        const e = document.querySelector(s);
+        if (e && e.value && e.value.length > 30) return e.value;
+    }
+    return '';
+}"""
+
+
+def _read_recaptcha_token(page) -> str:
+    """Lit le token reCAPTCHA dans le DOM ("" si absent)."""
+    try:
+        return page.evaluate(_JS_RECAPTCHA_TOKEN)
+    except Exception:
+        return ""
+
+
 def is_captcha_solved(page) -> bool:
     """Vérifie si le captcha est résolu (token reCAPTCHA présent)."""
-    selectors = [
-        "#g-recaptcha-response-2",
-        "#g-recaptcha-response",
-        'textarea[name="g-recaptcha-response"]',
-    ]
-    for selector in selectors:
-        try:
-            token = page.evaluate(f'document.querySelector("{selector}")?.value || ""')
-            if token and len(token) > 30:
-                return True
-        except Exception:
-            pass
-    return False
+    return bool(_read_recaptcha_token(page))
 
 
 def detect_captcha_type(page) -> dict:
@@ -104,6 +115,16 @@ def detect_captcha_type(page) -> dict:
         return {"type": "unknown", "iframe": None}
 
 
+# Mots-clés du body (une passe, insensible à la casse) : un groupe par description
+_CHALLENGE_KEYWORDS = re.compile(r"(feu|traffic)|(voiture|car)|(pont|bridge)|(panneau|sign)", re.I)
+_CHALLENGE_DESCRIPTIONS = (
+    "Sélectionnez toutes les images avec des feux de circulation",
+    "Sélectionnez toutes les images avec des voitures",
+    "Sélectionnez toutes les images avec des ponts",
+    "Sélectionnez toutes les images avec des panneaux",
+)
+
+
 def _extract_challenge_text(challenge_frame) -> str:
     """Extrait l'instruction textuelle du challenge captcha."""
     selectors = [
@@ -128,20 +149,9 @@ def _extract_challenge_text(challenge_frame) -> str:
     try:
         body = challenge_frame.query_selector("body")
         if body:
-            all_text = body.inner_text().lower()
-            patterns = {
-                "feu": "Sélectionnez toutes les images avec des feux de circulation",
-                "traffic": "Sélectionnez toutes les images avec des feux de circulation",
-                "voiture": "Sélectionnez toutes les images avec des voitures",
-                "car": "Sélectionnez toutes les images avec des voitures",
-                "pont": "Sélectionnez toutes les images avec des ponts",
-                "bridge": "Sélectionnez toutes les images avec des ponts",
-                "panneau": "Sélectionnez toutes les images avec des panneaux",
-                "sign": "Sélectionnez toutes les images avec des panneaux",
-            }
-            for keyword, description in patterns.items():
-                if keyword in all_text:
-                    return description
+            match = _CHALLENGE_KEYWORDS.search(body.inner_text())
+            if match:
+                return _CHALLENGE_DESCRIPTIONS[match.lastindex - 1]
     except Exception:
         pass
 
@@ -190,6 +200,30 @@ def try_auto_solve(page, wait_after_checkbox: int = 5) -> bool:
 # Interaction avec les images
 # ============================================================
 
+# Localise les tiles (mêmes replis que les sélecteurs successifs) et renvoie
+# le centre des tiles demandées, en un seul aller-retour CDP
+_JS_TILE_CENTERS = """(idxs) => {
+    let tiles = [];
+    for (const s of ['.rc-imageselect-tile', 'td.rc-imageselect-tile',
+                     'table.rc-imageselect-table td']) {
+        tiles = document.querySelectorAll(s);
+        if (tiles.length) break;
+    }
+    if (!tiles.length) {
+        tiles = [...document.querySelectorAll('td')].filter(
+            t => t.querySelector("img, div[style*='background']"));
+    }
+    const points = idxs.map(i => {
+        const t = tiles[i - 1];
+        if (!t) return null;
+        t.scrollIntoView({block: 'nearest'});
+        const r = t.getBoundingClientRect();
+        return [r.x + r.width / 2, r.y + r.height / 2];
+    });
+    return {count: tiles.length, points: points};
+}"""
+
+
 def click_images(challenge_frame, image_indices: list[int]) -> bool:
     """
     Clique sur les images du captcha par leurs indices (1-indexed).
@@ -199,46 +233,28 @@ def click_images(challenge_frame, image_indices: list[int]) -> bool:
         image_indices: Liste d'indices 1-indexed (ex: [1, 3, 5])
     """
     try:
-        # Chercher les tiles d'images
-        tile_selectors = [
-            ".rc-imageselect-tile",
-            "td.rc-imageselect-tile",
-            "table.rc-imageselect-table td",
-        ]
+        found = challenge_frame.evaluate(_JS_TILE_CENTERS, image_indices)
+        count = found["count"]
 
-        image_tiles = None
-        for selector in tile_selectors:
-            tiles = challenge_frame.query_selector_all(selector)
-            if tiles and len(tiles) > 0:
-                image_tiles = tiles
-                break
-
-        if not image_tiles:
-            # Dernier recours: tous les td avec images
-            all_tds = challenge_frame.query_selector_all("td")
-            image_tiles = [
-                t for t in all_tds
-                if t.query_selector("img") or t.query_selector("div[style*='background']")
-            ]
-
-        if not image_tiles:
+        if not count:
             print("[CAPTCHA] ❌ Aucune image trouvée")
             return False
 
-        print(f"[CAPTCHA] {len(image_tiles)} images trouvées, clic sur: {image_indices}")
+        print(f"[CAPTCHA] {count} images trouvées, clic sur: {image_indices}")
 
-        for idx in image_indices:
-            array_idx = idx - 1  # Convertir en 0-indexed
-            if 0 <= array_idx < len(image_tiles):
-                try:
-                    tile = image_tiles[array_idx]
-                    tile.click(force=True)
-                    print(f"[CAPTCHA] ✅ Image {idx} cliquée")
-                    time.sleep(0.5)
-                except Exception as e:
-                    print(f"[CAPTCHA] ❌ Erreur clic image {idx}: {e}")
-            else:
-                print(f"[CAPTCHA] ⚠️ Indice {idx} hors limites (max {len(image_tiles)})")
+        # Clics souris réels (événements de confiance) aux coordonnées de la page
+        frame_box = challenge_frame.frame_element().bounding_box()
+        mouse = challenge_frame.page.mouse
+
+        for idx, point in zip(image_indices, found["points"]):
+            if point is None:
+                print(f"[CAPTCHA] ⚠️ Indice {idx} hors limites (max {count})")
+                continue
+            try:
+                mouse.click(frame_box["x"] + point[0], frame_box["y"] + point[1])
+                print(f"[CAPTCHA] ✅ Image {idx} cliquée")
+            except Exception as e:
+                print(f"[CAPTCHA] ❌ Erreur clic image {idx}: {e}")
 
         return True
 
@@ -342,25 +358,20 @@ def handle_audio_captcha(
 
         print(f"[CAPTCHA] 🔗 Audio: {audio_url[:60]}...")
 
-        # Télécharger et envoyer sur Telegram
-        audio_path = os.path.join(CAPTCHA_TEMP_DIR, f"captcha_audio_{int(time.time())}.mp3")
+        # Télécharger et relayer sur Telegram depuis la mémoire (pas d'écriture disque)
         try:
-            import requests as req
-            resp = req.get(audio_url, timeout=30)
+            resp = TG_SESSION.get(audio_url, timeout=30)
             if resp.status_code != 200:
                 print("[CAPTCHA] ❌ Téléchargement audio échoué")
                 return False
 
-            with open(audio_path, "wb") as f:
-                f.write(resp.content)
-
             send_telegram_message(
                 bot_token, chat_id,
                 "🎧 <b>CAPTCHA AUDIO</b>\n\n"
                 "1️⃣ Écoutez et envoyez le code\n"
                 "2️⃣ Envoyez <b>r</b> pour rafraîchir l'audio"
             )
-            send_telegram_audio(bot_token, chat_id, audio_path, "Captcha Audio")
+            send_telegram_audio(bot_token, chat_id, resp.content, "Captcha Audio")
 
         except Exception as e:
             print(f"[CAPTCHA] ❌ Erreur audio: {e}")
@@ -369,9 +380,15 @@ def handle_audio_captcha(
         # Attendre la réponse
         loop_start = time.time()
         refreshed = False
+        # Champ de saisie résolu une fois par audio (réinitialisé si détaché)
+        input_field = None
 
         while time.time() - loop_start < 120:
-            messages = get_telegram_messages(bot_token, chat_id, last_update_id)
+            # Long polling : le code arrive dès son envoi, sans attente fixe
+            poll_start = time.monotonic()
+            messages = get_telegram_messages(
+                bot_token, chat_id, last_update_id, timeout=AUDIO_POLL_TIMEOUT
+            )
 
             for msg in messages:
                 last_update_id = max(last_update_id, msg["update_id"])
@@ -392,7 +409,8 @@ def handle_audio_captcha(
                     send_telegram_message(bot_token, chat_id, f"✅ Essai: <code>{text}</code>")
 
                     try:
-                        input_field = challenge_frame.query_selector("#audio-response")
+                        if input_field is None:
+                            input_field = challenge_frame.query_selector("#audio-response")
                         if input_field:
                             input_field.fill(text)
                             time.sleep(1)
@@ -411,12 +429,15 @@ def handle_audio_captcha(
                                         "❌ Code incorrect. Réessayez ou envoyez 'r' pour changer."
                                     )
                     except Exception as e:
+                        input_field = None
                         print(f"[CAPTCHA] Erreur saisie audio: {e}")
 
             if refreshed:
                 break
 
-            time.sleep(2)
+            # Retour anticipé sans message (erreur, 409) : ne pas marteler l'API
+            if not messages and time.monotonic() - poll_start < AUDIO_POLL_TIMEOUT:
+                time.sleep(2)
 
     return False
 
@@ -522,17 +543,15 @@ def _handle_image_challenge(
         send_telegram_message(bot_token, chat_id, "❌ Capture captcha vide")
         return False
 
-    # Envoyer l'instruction
-    send_telegram_message(
-        bot_token, chat_id,
+    # Capture + instruction en légende : une seule requête
+    send_telegram_photo(
+        bot_token, chat_id, screenshot_path,
         f"🔐 <b>CAPTCHA IMAGES</b>\n\n"
         f"📝 <b>{challenge_text}</b>\n\n"
         f"💬 Répondez avec les numéros (ex: <code>1,3,5</code>)\n"
         f"📌 <b>v</b> = valider | <b>audio</b> = mode audio\n"
         f"⏰ Timeout: {timeout // 60} min"
     )
-    time.sleep(1)
-    send_telegram_photo(bot_token, chat_id, screenshot_path, f"📝 {challenge_text}")
 
     # Boucle d'interaction
     last_update_id = 0
@@ -606,16 +625,18 @@ def _handle_passive_wait(
     except Exception:
         pass
 
-    send_telegram_message(
-        bot_token, chat_id,
+    instructions = (
         "🔐 <b>CAPTCHA À RÉSOUDRE</b>\n\n"
         "📍 Site: the-odds-api.com\n"
         f"⏰ Timeout: {timeout // 60} minutes\n\n"
         "👉 Résolvez dans le navigateur (VNC/Remote Desktop)"
     )
 
+    # Capture + instructions en légende : une seule requête
     if os.path.exists(screenshot_path):
-        send_telegram_photo(bot_token, chat_id, screenshot_path, "Captcha")
+        send_telegram_photo(bot_token, chat_id, screenshot_path, instructions)
+    else:
+        send_telegram_message(bot_token, chat_id, instructions)
 
     print("[CAPTCHA] Attente résolution passive...")
 
@@ -861,22 +882,10 @@ def extract_recaptcha_token(page) -> str | None:
     Returns:
         Token reCAPTCHA (string longue) ou None si non trouvé.
     """
-    selectors = [
-        "#g-recaptcha-response-2",
-        "#g-recaptcha-response",
-        'textarea[name="g-recaptcha-response"]',
-    ]
-
-    for selector in selectors:
-        try:
-            token = page.evaluate(
-                f'document.querySelector("{selector}")?.value || ""'
-            )
-            if token and len(token) > 30:
-                print(f"[CAPTCHA] 🔑 Token extrait ({len(token)} chars)")
-                return token
-        except Exception:
-            pass
+    token = _read_recaptcha_token(page)
+    if token:
+        print(f"[CAPTCHA] 🔑 Token extrait ({len(token)} chars)")
+        return token
 
     print("[CAPTCHA] ❌ Token reCAPTCHA introuvable")
     return None
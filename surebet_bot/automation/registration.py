@@ -50,9 +50,11 @@ except ImportError:
         "Martin", "Lee", "Thompson", "White", "Harris", "Sanchez",
         "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young",
     ]
+    # Noms complets précalculés (~1 100 chaînes) : un seul tirage par nom
+    FULL_NAMES = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
 
     def generate_random_name() -> str:
-        return f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+        return random.choice(FULL_NAMES)
 
 
 # URL et sélecteurs
@@ -1,20 +1,34 @@
 """
-Telegram Relay — Communication synchrone (requests)
-====================================================
+Telegram Relay — Communication synchrone (requests.Session)
+============================================================
 Envoi de messages, photos et récupération de commandes
 via l'API Telegram Bot.
+
+Variantes async (session aiohttp fournie par l'appelant) pour le
+polling des commandes sur une boucle asyncio.
 """
 
 import os
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Session partagée : connexion TCP+TLS réutilisée entre les appels
+# (polling des commandes, messages, photos, audio) au lieu d'un handshake par requête
+TG_SESSION = requests.Session()
+TG_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
 
 
 def send_telegram_message(bot_token: str, chat_id: str, message: str) -> bool:
     """Envoie un message texte sur Telegram."""
     try:
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        response = requests.post(url, data={
+        response = TG_SESSION.post(url, data={
             "chat_id": chat_id,
             "text": message,
             "parse_mode": "HTML"
@@ -50,7 +64,7 @@ def send_telegram_photo(bot_token: str, chat_id: str, image_path: str, caption:
         if file_size < 10 * 1024 * 1024:
             url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
             with open(image_path, "rb") as photo:
-                response = requests.post(url, data={
+                response = TG_SESSION.post(url, data={
                     "chat_id": chat_id,
                     "caption": caption,
                     "parse_mode": "HTML"
@@ -64,7 +78,7 @@ def send_telegram_photo(bot_token: str, chat_id: str, image_path: str, caption:
         # Fallback: envoyer comme document (supporte fichiers plus gros)
         url = f"https://api.telegram.org/bot{bot_token}/sendDocument"
         with open(image_path, "rb") as doc:
-            response = requests.post(url, data={
+            response = TG_SESSION.post(url, data={
                 "chat_id": chat_id,
                 "caption": caption,
                 "parse_mode": "HTML"
@@ -81,18 +95,23 @@ def send_telegram_photo(bot_token: str, chat_id: str, image_path: str, caption:
         return False
 
 
-def send_telegram_audio(bot_token: str, chat_id: str, audio_path: str, title: str = "Audio") -> bool:
-    """Envoie un fichier audio sur Telegram."""
+def send_telegram_audio(
+    bot_token: str, chat_id: str, audio: str | bytes, title: str = "Audio"
+) -> bool:
+    """Envoie un audio sur Telegram (chemin de fichier ou contenu MP3 en mémoire)."""
     try:
-        if not os.path.exists(audio_path):
-            return False
-
         url = f"https://api.telegram.org/bot{bot_token}/sendAudio"
-        with open(audio_path, "rb") as audio:
-            response = requests.post(url, data={
-                "chat_id": chat_id,
-                "title": title
-            }, files={"audio": audio}, timeout=30)
+        data = {"chat_id": chat_id, "title": title}
+
+        if isinstance(audio, bytes):
+            response = TG_SESSION.post(url, data=data, files={
+                "audio": ("audio.mp3", audio, "audio/mpeg")
+            }, timeout=30)
+        else:
+            if not os.path.exists(audio):
+                return False
+            with open(audio, "rb") as audio_file:
+                response = TG_SESSION.post(url, data=data, files={"audio": audio_file}, timeout=30)
 
         return response.status_code == 200
     except Exception as e:
@@ -100,39 +119,88 @@ def send_telegram_audio(bot_token: str, chat_id: str, audio_path: str, title: st
         return False
 
 
-def get_telegram_messages(bot_token: str, chat_id: str, last_update_id: int = 0) -> list[dict]:
+def get_telegram_messages(
+    bot_token: str, chat_id: str, last_update_id: int = 0, timeout: int = 1
+) -> list[dict]:
     """
     Récupère les nouveaux messages Telegram.
     
+    Args:
+        timeout: Long polling (secondes) : Telegram garde la requête ouverte
+            jusqu'à l'arrivée d'un message ou l'expiration du délai
+    
     Returns:
         Liste de dicts avec: update_id, text, from
     """
     try:
         url = f"https://api.telegram.org/bot{bot_token}/getUpdates"
-        response = requests.get(url, params={
+        response = TG_SESSION.get(url, params={
             "offset": last_update_id + 1,
-            "timeout": 1,
+            "timeout": timeout,
             "allowed_updates": ["message"]
-        }, timeout=5)
+        }, timeout=timeout + 5)  # Le timeout HTTP doit dépasser celui de Telegram
 
         if response.status_code != 200:
             return []
 
-        data = response.json()
-        messages = []
+        return parse_telegram_updates(response.json(), chat_id)
+
+    except Exception as e:
+        print(f"[TELEGRAM] Erreur récupération messages: {e}")
+        return []
+
+
+def parse_telegram_updates(data: dict, chat_id: str) -> list[dict]:
+    """Extrait les messages du chat d'une réponse getUpdates."""
+    messages = []
+
+    for update in data.get("result", []):
+        msg = update.get("message", {})
+        msg_chat_id = str(msg.get("chat", {}).get("id", ""))
+
+        if msg_chat_id == chat_id:
+            messages.append({
+                "update_id": update.get("update_id", 0),
+                "text": msg.get("text", ""),
+                "from": msg.get("from", {}).get("username", "Unknown")
+            })
+
+    return messages
 
-        for update in data.get("result", []):
-            msg = update.get("message", {})
-            msg_chat_id = str(msg.get("chat", {}).get("id", ""))
 
-            if msg_chat_id == chat_id:
-                messages.append({
-                    "update_id": update.get("update_id", 0),
-                    "text": msg.get("text", ""),
-                    "from": msg.get("from", {}).get("username", "Unknown")
-                })
+async def send_telegram_message_async(session, bot_token: str, chat_id: str, message: str) -> bool:
+    """Envoie un message texte sur Telegram (session aiohttp)."""
+    try:
+        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        async with session.post(url, data={
+            "chat_id": chat_id,
+            "text": message,
+            "parse_mode": "HTML"
+        }) as response:
+            return response.status == 200
+    except Exception as e:
+        print(f"[TELEGRAM] ❌ Erreur envoi message: {e}")
+        return False
 
-        return messages
+
+async def get_telegram_messages_async(
+    session, bot_token: str, chat_id: str, last_update_id: int = 0, timeout: int = 1
+) -> list[dict]:
+    """
+    Récupère les nouveaux messages Telegram (session aiohttp, long polling).
+    
+    Le timeout HTTP de la session doit dépasser `timeout`.
+    """
+    try:
+        url = f"https://api.telegram.org/bot{bot_token}/getUpdates"
+        async with session.get(url, params={
+            "offset": last_update_id + 1,
+            "timeout": timeout,
+            "allowed_updates": '["message"]'
+        }) as response:
+            if response.status != 200:
+                return []
+            return parse_telegram_updates(await response.json(), chat_id)
 
     except Exception as e:
         print(f"[TELEGRAM] Erreur récupération messages: {e}")
@@ -142,7 +210,7 @@ def get_telegram_messages(bot_token: str, chat_id: str, last_update_id: int = 0)
 def check_telegram_bot(bot_token: str) -> bool:
     """Vérifie que le bot Telegram est accessible."""
     try:
-        r = requests.get(
+        r = TG_SESSION.get(
             f"https://api.telegram.org/bot{bot_token}/getMe",
             timeout=5
         )
@@ -31,6 +31,7 @@ from constants import (
     SCAN_INTERVAL,
     REQUEST_DELAY,
     COOLDOWN_MINUTES,
+    MAX_CONCURRENT_SCANS,
     # Dashboard
     DASHBOARD_HOST,
     DASHBOARD_PORT,
@@ -151,6 +151,7 @@ NFL_PLAYER_PROPS = [
 SCAN_INTERVAL = 10       # secondes entre chaque cycle complet
 REQUEST_DELAY = 10       # secondes entre chaque requête API (rate limit)
 COOLDOWN_MINUTES = 5     # anti-doublon d'alertes (minutes)
+MAX_CONCURRENT_SCANS = 8 # sports scannés en parallèle par cycle (le rate limit reste géré par OddsClient)
 
 
 # ── LIENS BOOKMAKERS ─────────────────────────────────────────────
@@ -199,52 +200,53 @@ GENERATION_TIMEOUT = 600     # Timeout génération de clé (secondes)
 # Créneaux temporels stratégiques pour la détection de surebets.
 # Les créneaux sont évalués par ordre de priorité (SLOT_PRIORITY).
 # Le premier créneau correspondant à jour+heure est retourné.
+# Les jours sont des frozenset (weekday=0 pour lundi, test d'appartenance O(1)).
 
 SCHEDULE_SLOTS = {
     "live_weekend": {
-        "days": [5, 6],                # samedi=5, dimanche=6
+        "days": frozenset({5, 6}),      # samedi=5, dimanche=6
         "hours": (14, 22),             # 14h00 - 22h00
         "scan_interval": 5,            # Scan très agressif (5s)
         "label": "🔴 LIVE Week-end",
         "description": "Volume massif de matchs en Live",
     },
     "nfl_night": {
-        "days": [0, 3, 6],             # lundi, jeudi, dimanche (prime time NFL USA = 1h-4h CET)
+        "days": frozenset({0, 3, 6}),   # lundi, jeudi, dimanche (prime time NFL USA = 1h-4h CET)
         "hours": (1, 4),               # 01h00 - 04h00 CET
         "scan_interval": 7,            # Scan rapide
         "label": "🏈 NFL Nuit",
         "description": "Matchs NFL en direct depuis les USA",
     },
     "evening_weekday": {
-        "days": [0, 1, 2, 3, 4],       # lundi-vendredi
+        "days": frozenset({0, 1, 2, 3, 4}),  # lundi-vendredi
         "hours": (19, 21),             # 19h00 - 21h00
         "scan_interval": 5,            # Scan agressif
         "label": "🌙 Soir Semaine",
         "description": "Matchs européens et ajustements dernière minute",
     },
     "late_evening": {
-        "days": [0, 1, 2, 3, 4],       # lundi-vendredi
+        "days": frozenset({0, 1, 2, 3, 4}),  # lundi-vendredi
         "hours": (21, 23),             # 21h00 - 23h00 : fin CL + tip-off NBA
         "scan_interval": 7,            # Scan rapide
         "label": "🌃 Soirée Tardive",
         "description": "Fin des matchs européens + début NBA",
     },
     "boosted_odds": {
-        "days": [0, 1, 2, 3, 4, 5, 6], # tous les jours
+        "days": frozenset({0, 1, 2, 3, 4, 5, 6}),  # tous les jours
         "hours": (17, 20),             # 17h00 - 20h00
         "scan_interval": 7,            # Scan rapide
         "label": "🚀 Cotes Boostées",
         "description": "Winamax/Unibet sortent les cotes boostées",
     },
     "morning_realignment": {
-        "days": [0, 1, 2, 3, 4, 5, 6], # tous les jours
+        "days": frozenset({0, 1, 2, 3, 4, 5, 6}),  # tous les jours
         "hours": (9, 10),              # 09h00 - 10h00
         "scan_interval": 8,            # Scan modéré
         "label": "☀️ Réalignement Matin",
         "description": "Réalignement des cotes sur les marchés mondiaux",
     },
     "default": {
-        "days": [0, 1, 2, 3, 4, 5, 6],
+        "days": frozenset({0, 1, 2, 3, 4, 5, 6}),
         "hours": (0, 24),
         "scan_interval": 15,           # Scan calme
         "label": "💤 Hors-créneau",
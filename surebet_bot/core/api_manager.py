@@ -1,13 +1,17 @@
 # Gestionnaire de clés API avec failover automatique - VERSION CORRIGÉE
 
 import asyncio
+import logging
 from pathlib import Path
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import subprocess
 import sys
 
 
+logger = logging.getLogger("surebet_bot.api_manager")
+
+
 @dataclass
 class APIKey:
     """Représente une clé API."""
@@ -16,6 +20,10 @@ class APIKey:
     is_valid: bool = True
     requests_used: int = 0
     error_count: int = 0  # Nouveau: compteur d'erreurs
+    short: str = field(init=False, repr=False)  # Forme abrégée (logs, DB, status)
+    
+    def __post_init__(self):
+        self.short = self.key[:8] + "..."
 
 
 class APIManager:
@@ -42,7 +50,7 @@ class APIManager:
         self.keys = []
         
         if not self.keys_file.exists():
-            print(f"[APIManager] ⚠️ Fichier de clés non trouvé: {self.keys_file}")
+            logger.warning("⚠️ Fichier de clés non trouvé: %s", self.keys_file)
             return 0
             
         with open(self.keys_file, "r") as f:
@@ -54,7 +62,7 @@ class APIManager:
                 elif line and len(line) == 32:
                     self.keys.append(APIKey(email="unknown", key=line))
         
-        print(f"[APIManager] ✅ {len(self.keys)} clé(s) API chargée(s)")
+        logger.info("✅ %d clé(s) API chargée(s)", len(self.keys))
         return len(self.keys)
     
     @property
@@ -64,6 +72,13 @@ class APIManager:
             return None
         return self.keys[self.current_index].key
     
+    @property
+    def current_short_key(self) -> Optional[str]:
+        """Clé active abrégée ("abcd1234..."), calculée une fois par clé."""
+        if not self.keys:
+            return None
+        return self.keys[self.current_index].short
+    
     @property
     def current_email(self) -> Optional[str]:
         """Retourne l'email associé à la clé active."""
@@ -98,8 +113,8 @@ class APIManager:
         )
         
         if quota_error:
-            print(f"[APIManager] ⚠️ Erreur quota détectée: {status_code}")
-            print(f"[APIManager] 📝 Réponse: {response_text[:200]}")
+            logger.warning("⚠️ Erreur quota détectée: %s", status_code)
+            logger.warning("📝 Réponse: %.200s", response_text)
             return await self.failover()
         
         return False
@@ -119,7 +134,7 @@ class APIManager:
                 old_key = self.keys[self.current_index]
                 old_key.is_valid = False
                 old_key.error_count += 1
-                print(f"[APIManager] ❌ Clé {old_key.key[:8]}... marquée invalide")
+                logger.warning("❌ Clé %.8s... marquée invalide", old_key.key)
             
             # Chercher la prochaine clé valide
             original_index = self.current_index
@@ -128,26 +143,26 @@ class APIManager:
                 self.current_index = (self.current_index + 1) % len(self.keys)
                 if self.keys[self.current_index].is_valid:
                     new_key = self.keys[self.current_index]
-                    print(f"[APIManager] ✅ Failover vers clé {new_key.key[:8]}... ({new_key.email})")
+                    logger.info("✅ Failover vers clé %.8s... (%s)", new_key.key, new_key.email)
                     return True
                 if self.current_index == original_index:
                     break
             
-            print(f"[APIManager] ⚠️ Plus de clés valides! ({len(self.keys)} clés, toutes invalides)")
+            logger.warning("⚠️ Plus de clés valides! (%d clés, toutes invalides)", len(self.keys))
             
             # Plus de clés valides - tenter de générer une nouvelle
             if self.auto_generate:
-                print("[APIManager] 🔄 Tentative de génération d'une nouvelle clé...")
+                logger.info("🔄 Tentative de génération d'une nouvelle clé...")
                 success = await self.generate_new_key()
                 if success:
                     # Recharger les clés sous lock pour éviter la race condition
                     self.load_keys()
                     if self.keys:
                         self.current_index = len(self.keys) - 1
-                    print(f"[APIManager] ✅ Nouvelle clé générée: {self.current_key[:8] if self.current_key else 'N/A'}...")
+                    logger.info("✅ Nouvelle clé générée: %.8s...", self.current_key or "N/A")
                     return True
                 else:
-                    print("[APIManager] ❌ Échec de génération de nouvelle clé")
+                    logger.error("❌ Échec de génération de nouvelle clé")
             
             return False
     
@@ -171,14 +186,14 @@ class APIManager:
         for path in possible_paths:
             if path.exists():
                 script_path = path
-                print(f"[APIManager] 📍 Script trouvé: {script_path}")
+                logger.info("📍 Script trouvé: %s", script_path)
                 break
         
         if not script_path:
-            print(f"[APIManager] ❌ Script odds_api_full_automation.py non trouvé")
-            print(f"[APIManager]    Chemins recherchés:")
-            for p in possible_paths:
-                print(f"[APIManager]    - {p}")
+            logger.error(
+                "❌ Script odds_api_full_automation.py non trouvé. Chemins recherchés: %s",
+                ", ".join(str(p) for p in possible_paths)
+            )
             return False
         
         try:
@@ -199,7 +214,7 @@ class APIManager:
                 cwd=str(script_path.parent)  # Important: exécuter dans le bon dossier
             )
             
-            print("[APIManager] ⏳ Génération en cours (max 10 min)...")
+            logger.info("⏳ Génération en cours (max 10 min)...")
             
             stdout, stderr = await asyncio.wait_for(
                 process.communicate(),
@@ -207,7 +222,7 @@ class APIManager:
             )
             
             if process.returncode == 0:
-                print("[APIManager] ✅ Script terminé avec succès")
+                logger.info("✅ Script terminé avec succès")
                 
                 # Copier la nouvelle clé vers notre fichier api_keys.txt
                 if script_keys_file.exists():
@@ -223,26 +238,25 @@ class APIManager:
                             for key_line in added_keys:
                                 if key_line.strip():
                                     f.write(f"{key_line}\n")
-                                    print(f"[APIManager] 📝 Nouvelle clé ajoutée: {key_line[:20]}...")
+                                    logger.info("📝 Nouvelle clé ajoutée: %.20s...", key_line)
                         return True
                     else:
-                        print("[APIManager] ⚠️ Aucune nouvelle clé détectée dans le fichier")
+                        logger.warning("⚠️ Aucune nouvelle clé détectée dans le fichier")
                         return False
                 else:
-                    print(f"[APIManager] ⚠️ Fichier {script_keys_file} non trouvé après exécution")
+                    logger.warning("⚠️ Fichier %s non trouvé après exécution", script_keys_file)
                     return False
             else:
-                print(f"[APIManager] ❌ Script échoué (code {process.returncode})")
+                logger.error("❌ Script échoué (code %s)", process.returncode)
                 if stderr:
-                    print(f"[APIManager]    Erreur: {stderr.decode()[:200]}")
+                    logger.error("   Erreur: %.200s", stderr.decode(errors="replace"))
                 return False
             
         except asyncio.TimeoutError:
-            print("[APIManager] ❌ Timeout: génération trop longue (>10 min)")
+            logger.error("❌ Timeout: génération trop longue (>10 min)")
             return False
         except Exception as e:
-            import traceback
-            print(f"[APIManager] ❌ Exception: {e}\n{traceback.format_exc()}")
+            logger.exception("❌ Exception: %s", e)
             return False
     
     def get_status(self) -> dict:
@@ -250,7 +264,7 @@ class APIManager:
         return {
             "total_keys": len(self.keys),
             "valid_keys": self.valid_keys_count,
-            "current_key": self.current_key[:8] + "..." if self.current_key else None,
+            "current_key": self.current_short_key,
             "current_email": self.current_email,
             "auto_generate": self.auto_generate,
             "failover_count": self.failover_count,
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ValueBet:
     """Un value bet détecté sur un outcome précis."""
     outcome_name: str
@@ -15,7 +15,7 @@ class ValueBet:
     bookmakers_count: int   # Nb bookmakers ayant participé au consensus
 
 
-@dataclass
+@dataclass(slots=True)
 class SurebetResult:
     """Résultat d'un calcul d'arbitrage."""
     is_surebet: bool
@@ -39,6 +39,26 @@ def calculate_implied_probability(odds: list[float]) -> float:
     return sum(1/o for o in odds)
 
 
+def _raise_invalid_input(odds: list[float], total_stake: float) -> None:
+    """Lève l'erreur de validation détaillée pour calculate_arbitrage."""
+    if not odds:
+        raise ValueError("La liste des cotes ne peut pas être vide")
+    
+    if len(odds) < 2:
+        raise ValueError("Au moins 2 cotes sont nécessaires pour un arbitrage")
+    
+    invalid_odds = [o for o in odds if o <= 1.0]
+    if invalid_odds:
+        raise ValueError(
+            f"Cotes invalides détectées: {invalid_odds}. "
+            f"Les cotes doivent être > 1.0"
+        )
+    
+    raise ValueError(
+        f"La mise totale doit être positive, reçu: {total_stake}"
+    )
+
+
 def calculate_arbitrage(odds: list[float], total_stake: float = 100.0) -> SurebetResult:
     """
     Calcule si un arbitrage est possible et le profit associé.
@@ -53,26 +73,15 @@ def calculate_arbitrage(odds: list[float], total_stake: float = 100.0) -> Surebe
     Raises:
         ValueError: Si les données d'entrée sont invalides
     """
-    # Validation des entrées
-    if not odds:
-        raise ValueError("La liste des cotes ne peut pas être vide")
-    
-    if len(odds) < 2:
-        raise ValueError("Au moins 2 cotes sont nécessaires pour un arbitrage")
-    
-    if any(o <= 1.0 for o in odds):
-        invalid_odds = [o for o in odds if o <= 1.0]
-        raise ValueError(
-            f"Cotes invalides détectées: {invalid_odds}. "
-            f"Les cotes doivent être > 1.0"
-        )
-    
-    if total_stake <= 0:
-        raise ValueError(
-            f"La mise totale doit être positive, reçu: {total_stake}"
-        )
+    # Validation des entrées en un seul test (chemin nominal sans boucle
+    # Python supplémentaire) ; le détail de l'erreur n'est construit que
+    # si les données sont effectivement invalides.
+    if len(odds) < 2 or min(odds) <= 1.0 or total_stake <= 0:
+        _raise_invalid_input(odds, total_stake)
     
-    L = calculate_implied_probability(odds)
+    # Inverses calculés une seule fois : réutilisés pour L et pour les mises
+    inv_odds = [1.0 / o for o in odds]
+    L = sum(inv_odds)
     
     is_surebet = L < 1.0
     
@@ -82,7 +91,8 @@ def calculate_arbitrage(odds: list[float], total_stake: float = 100.0) -> Surebe
         
         # Mises optimales pour garantir le même gain sur chaque issue
         # stake_i = total_stake * (1/cote_i) / L
-        stakes = [(total_stake * (1/o) / L) for o in odds]
+        scale = total_stake / L
+        stakes = [scale * inv for inv in inv_odds]
         
         # Gain garanti
         # Gain = stake_i * cote_i - total_stake
@@ -1,21 +1,165 @@
 # Client The Odds API - Version Complète (avec Rate Limiting)
 
 import asyncio
+import logging
+import random
 import time
 import aiohttp
-from typing import Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Mapping, Optional, Sequence
+from yarl import URL
 from dataclasses import dataclass, field
 
+# orjson (optionnel) : parsing JSON nettement plus rapide sur les gros payloads de cotes
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
 
-@dataclass
+logger = logging.getLogger("surebet_bot.odds_client")
+
+# Requêtes simultanées max vers l'API : taille du pool keep-alive par hôte
+# et concurrence par défaut du fan-out (get_many_event_odds)
+MAX_PARALLEL_REQUESTS = 4
+
+# Au-delà de cette taille (octets), le JSON est parsé dans un thread
+# pour ne pas bloquer la boucle asyncio
+LARGE_PAYLOAD_BYTES = 256_000
+
+# Taille max conservée d'un corps d'erreur (octets)
+ERROR_BODY_MAX_BYTES = 2048
+
+# Params vides partagés (jamais modifiés)
+_NO_PARAMS: Mapping = {}
+
+
+class _InflightCancelled(Exception):
+    """La requête partagée a été annulée : les appels en attente la relancent."""
+
+
+def create_app_session(max_per_host: int = MAX_PARALLEL_REQUESTS) -> aiohttp.ClientSession:
+    """
+    Crée la session HTTP à partager entre tous les OddsClient de l'application.
+    
+    Connexions TLS gardées chaudes (keep-alive), cache DNS, pas de cookies
+    à gérer. `max_per_host` doit couvrir la concurrence du fan-out pour
+    qu'aucune requête n'attende une connexion libre (ni n'ouvre de socket
+    supplémentaire). Doit être appelée depuis une coroutine ; l'appelant la ferme.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=max(10, max_per_host),
+            limit_per_host=max_per_host,
+            keepalive_timeout=75,
+            ttl_dns_cache=300
+        ),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+
+@dataclass(slots=True)
 class OddsResponse:
     """Réponse de l'API."""
     success: bool
     data: Optional[list] = None
     error: Optional[str] = None
     status_code: int = 0
-    requests_remaining: int = 0
-    requests_used: int = 0
+    # -1 = inconnu (header absent/invalide, ou pas de réponse HTTP)
+    requests_remaining: int = -1
+    requests_used: int = -1
+    etag: Optional[str] = None
+    error_code: Optional[str] = None  # Champ "error_code" d'une erreur JSON de l'API
+    retry_after: int = -1  # Header Retry-After en secondes (-1 si absent)
+
+
+class AsyncLimiter:
+    """
+    Limiteur asynchrone de type leaky bucket.
+    
+    Autorise au plus `max_rate` acquisitions par fenêtre de `time_period`
+    secondes (rafale possible jusqu'à `max_rate`). L'état tient dans un
+    niveau + un horodatage monotonic : aucun lock n'est tenu pendant l'attente.
+    
+    Le débit peut être modifié à chaud (set_rate) ou suspendu (pause) :
+    les coroutines en attente sont réveillées via un asyncio.Condition et
+    recalculent leur délai.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._level = 0.0
+        self._last_check = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+    
+    def _leak(self):
+        """Vide le seau proportionnellement au temps écoulé."""
+        now = time.monotonic()
+        if self._level and self.time_period > 0:
+            elapsed = now - self._last_check
+            leaked = elapsed * self.max_rate / self.time_period
+            self._level = max(0.0, self._level - leaked)
+        self._last_check = now
+    
+    def _wake_waiters(self):
+        """Réveille les coroutines en attente pour qu'elles recalculent leur délai."""
+        async def _notify():
+            async with self._cond:
+                self._cond.notify_all()
+        try:
+            asyncio.get_running_loop().create_task(_notify())
+        except RuntimeError:
+            pass  # Pas de boucle active : aucun waiter à réveiller
+    
+    def set_rate(self, max_rate: float, time_period: float):
+        """Change le débit autorisé (pris en compte immédiatement)."""
+        self._leak()
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._wake_waiters()
+    
+    def pause(self, seconds: float):
+        """Suspend toute acquisition pendant `seconds` (ex: Retry-After)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._wake_waiters()
+    
+    def resume(self):
+        """Lève une pause en cours."""
+        self._paused_until = 0.0
+        self._wake_waiters()
+    
+    async def acquire(self, amount: float = 1.0):
+        """Attend qu'une place se libère dans le seau puis la consomme."""
+        while True:
+            self._leak()
+            wait_time = self._paused_until - time.monotonic()
+            if self.time_period > 0 and self._level + amount > self.max_rate:
+                wait_time = max(
+                    wait_time,
+                    (self._level + amount - self.max_rate)
+                    * self.time_period / self.max_rate
+                )
+            if wait_time <= 0:
+                self._level += amount
+                return
+            logger.debug("Rate limit: attente %.1fs", wait_time)
+            async with self._cond:
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=wait_time)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, *exc):
+        return None
 
 
 class OddsClient:
@@ -23,8 +167,24 @@ class OddsClient:
     Client asynchrone pour The Odds API.
     
     Rate limiting intégré:
-    - asyncio.Lock pour forcer les requêtes séquentielles
-    - Délai configurable entre chaque requête (défaut: 3s)
+    - Token bucket (AsyncLimiter), aucun lock tenu pendant l'attente
+    - Débit configurable en requêtes/minute, ou à défaut une requête
+      toutes les `request_delay` secondes (défaut: 3s)
+    - Rythme adapté aux headers de l'API : x-requests-remaining (si une
+      fenêtre de quota est configurée) et Retry-After sur 429
+    
+    Erreurs transitoires (réseau, timeout, 5xx): jusqu'à `max_retries`
+    nouveaux essais avec backoff exponentiel (0.5s, 1s, 2s...).
+    
+    Concurrence: au plus `max_concurrent` requêtes en vol (set_concurrency).
+    
+    Session HTTP: passer `session=create_app_session()` pour partager les
+    connexions entre clients ; close() ne ferme alors pas cette session.
+    
+    Clé API: fixe (`api_key`) ou lue à chaque requête via `key_provider`,
+    ce qui permet de changer de clé sans recréer le client (ni son pool).
+    Utilisable en `async with OddsClient(...) as client:` ; close() attend
+    la fin des requêtes en vol.
     
     Endpoints supportés:
     - GET /sports - Liste des sports
@@ -35,60 +195,361 @@ class OddsClient:
     
     BASE_URL = "https://api.the-odds-api.com/v4"
     
-    def __init__(self, api_key: str, request_delay: float = 3.0):
-        self.api_key = api_key
+    # Durée de vie du cache de réponses par type d'endpoint (secondes),
+    # déterminé par le dernier segment du chemin
+    CACHE_TTL = {
+        "sports": 3600,   # Liste des sports : quasi statique
+        "events": 300,    # Calendrier des événements
+        "markets": 300,   # Marchés disponibles d'un événement
+        "scores": 60,
+        "odds": 5,        # Cotes : rester sous l'intervalle de scan minimal
+    }
+    
+    # Entrées max du cache (LRU) : une clé par événement pour events/{id}/odds
+    # et markets, sans borne le cache grossirait pendant toute la vie du bot
+    CACHE_MAX_ENTRIES = 512
+    
+    def __init__(
+        self,
+        api_key: str,
+        request_delay: float = 3.0,
+        requests_per_minute: Optional[float] = None,
+        quota_window_seconds: Optional[float] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_concurrent: int = MAX_PARALLEL_REQUESTS,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        key_provider: Optional[Callable[[], Optional[str]]] = None
+    ):
+        self._api_key = api_key
+        # Source de la clé active (ex: APIManager.current_key), lue à chaque requête
+        self._key_provider = key_provider
         self.request_delay = request_delay
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._lock = asyncio.Lock()
-        self._last_request_time: float = 0.0
+        # Session partagée de l'application (voir create_app_session), sinon créée à la demande
+        self._session = session
+        self._owns_session = session is None
+        if requests_per_minute:
+            # Budget "X par minute" : rafales autorisées jusqu'à X
+            self._limiter = AsyncLimiter(requests_per_minute, time_period=60)
+        else:
+            # Fallback : une requête toutes les request_delay secondes
+            self._limiter = AsyncLimiter(1, time_period=request_delay)
+        # Débit de base (plancher) ; ralenti si le quota restant l'exige
+        self._base_rate = self._limiter.max_rate
+        self._base_period = self._limiter.time_period
+        # Fenêtre sur laquelle répartir le quota restant (None = désactivé)
+        self.quota_window_seconds = quota_window_seconds
+        # Partie constante de l'URL, parsée une seule fois
+        self._base_url = URL(self.BASE_URL)
+        # Cache LRU de réponses: (endpoint, params) -> (horodatage, réponse) ;
+        # gardé après le TTL pour les requêtes conditionnelles (ETag)
+        self._cache: OrderedDict[tuple, tuple[float, OddsResponse]] = OrderedDict()
+        # Requêtes en cours : les appels identiques concurrents partagent le résultat
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        # Réessais sur erreurs transitoires (réseau, timeout, 5xx)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        # Contrôle d'admission : au plus _max_concurrent requêtes HTTP en vol,
+        # ajustable à chaud via set_concurrency()
+        self._admission = asyncio.Condition()
+        self._active = 0
+        self._max_concurrent = max(1, max_concurrent)
+    
+    @property
+    def api_key(self) -> Optional[str]:
+        """Clé API utilisée pour la prochaine requête."""
+        if self._key_provider is not None:
+            return self._key_provider()
+        return self._api_key
+    
+    @api_key.setter
+    def api_key(self, value: Optional[str]):
+        self._api_key = value
+    
+    def reset_pacing(self):
+        """Restaure le débit de base et lève une pause (ex: après changement de clé)."""
+        self._limiter.resume()
+        self._limiter.set_rate(self._base_rate, self._base_period)
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Retourne ou crée une session HTTP."""
+        """Retourne la session HTTP (partagée si fournie, sinon créée)."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = create_app_session()
+            self._owns_session = True
         return self._session
     
     async def close(self):
-        """Ferme la session HTTP."""
-        if self._session and not self._session.closed:
+        """
+        Attend la fin des requêtes en vol puis ferme la session HTTP.
+        
+        La fermeture de session est sans effet si elle a été fournie au
+        constructeur : son propriétaire (l'application) la ferme lui-même.
+        """
+        async with self._admission:
+            await self._admission.wait_for(lambda: self._active == 0)
+        if self._owns_session and self._session and not self._session.closed:
             await self._session.close()
     
-    async def _request(self, endpoint: str, params: dict = None) -> OddsResponse:
-        """Effectue une requête GET avec rate limiting."""
-        async with self._lock:  # Une seule requête à la fois
-            # Respecter le délai minimum entre requêtes
-            now = time.monotonic()
-            elapsed = now - self._last_request_time
-            if self._last_request_time > 0 and elapsed < self.request_delay:
-                wait_time = self.request_delay - elapsed
-                print(f"[OddsClient] ⏳ Rate limit: attente {wait_time:.1f}s...")
-                await asyncio.sleep(wait_time)
-            
-            session = await self._get_session()
-            
-            params = params or {}
-            params["apiKey"] = self.api_key
-            
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    def set_request_delay(self, request_delay: float):
+        """Change le délai de base entre deux requêtes (pris en compte immédiatement)."""
+        self.request_delay = request_delay
+        self._base_rate = 1
+        self._base_period = request_delay
+        self._limiter.set_rate(1, request_delay)
+    
+    async def set_concurrency(self, max_concurrent: int):
+        """Change le nombre max de requêtes simultanées (pris en compte immédiatement)."""
+        async with self._admission:
+            self._max_concurrent = max(1, max_concurrent)
+            self._admission.notify_all()
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _csv(items: tuple[str, ...]) -> str:
+        """Joint une liste (bookmakers, event IDs) ; mémoïsé car souvent identique."""
+        return ",".join(items)
+    
+    def _cache_ttl(self, endpoint: str) -> float:
+        """TTL du cache pour un endpoint (0 = pas de cache)."""
+        return self.CACHE_TTL.get(endpoint.rsplit("/", 1)[-1], 0)
+    
+    def invalidate(self, prefix: str = ""):
+        """Supprime du cache les réponses dont l'endpoint commence par `prefix`."""
+        for key in [k for k in self._cache if k[0].startswith(prefix)]:
+            del self._cache[key]
+    
+    async def _request(self, endpoint: str, params: Optional[Mapping] = None) -> OddsResponse:
+        """Effectue une requête GET avec rate limiting, cache TTL et dédup des appels en cours."""
+        params = params or _NO_PARAMS
+        
+        # Servir depuis le cache si la réponse est encore fraîche.
+        # Chaque endpoint construit ses params dans un ordre fixe : pas besoin de trier.
+        ttl = self._cache_ttl(endpoint)
+        cache_key = (endpoint, tuple(params.items()))
+        cached = self._cache.get(cache_key)
+        if cached:
+            self._cache.move_to_end(cache_key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        # Requête identique déjà en cours : attendre son résultat
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except _InflightCancelled:
+                # Appel d'origine annulé : relancer (un des appels en attente reprend la main)
+                return await self._request(endpoint, params)
+        
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            response = await self._refresh(endpoint, params, cache_key, cached, ttl)
+        except asyncio.CancelledError:
+            fut.set_exception(_InflightCancelled())
+            fut.exception()  # Marquée lue : pas d'avertissement si personne n'attend
+            raise
+        except Exception as e:
+            # Les appels en attente reçoivent la vraie erreur
+            fut.set_exception(e)
+            fut.exception()
+            raise
+        else:
+            fut.set_result(response)
+        finally:
+            self._inflight.pop(cache_key, None)
+        
+        return response
+    
+    async def _refresh(
+        self,
+        endpoint: str,
+        params: Mapping,
+        cache_key: tuple,
+        cached: Optional[tuple[float, OddsResponse]],
+        ttl: float
+    ) -> OddsResponse:
+        """Interroge l'API (requête conditionnelle si possible) et met à jour le cache."""
+        # Réponse en cache avec ETag : l'API peut répondre 304 sans corps
+        etag = cached[1].etag if cached else None
+        response = await self._fetch(endpoint, params, etag)
+        
+        if response.status_code == 304 and cached:
+            # Données inchangées : corps en cache, compteurs de quota à jour
+            response = OddsResponse(
+                success=True,
+                data=cached[1].data,
+                status_code=304,
+                requests_remaining=(
+                    response.requests_remaining if response.requests_remaining >= 0
+                    else cached[1].requests_remaining
+                ),
+                requests_used=(
+                    response.requests_used if response.requests_used >= 0
+                    else cached[1].requests_used
+                ),
+                etag=response.etag or etag
+            )
+        
+        if response.success:
+            if ttl:
+                self._cache[cache_key] = (time.monotonic(), response)
+                self._cache.move_to_end(cache_key)
+                if len(self._cache) > self.CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)  # Moins récemment utilisée
+        elif cached and (response.status_code == 0 or response.status_code >= 500):
+            # Erreur transitoire (réseau/5xx) : réponse périmée plutôt que rien.
+            # Les erreurs 4xx (quota, clé invalide) remontent telles quelles
+            # pour déclencher le failover.
+            return cached[1]
+        
+        return response
+    
+    @staticmethod
+    def _hint(headers, key: str) -> int:
+        """Lit un header numérique ; -1 si absent ou non numérique (inconnu)."""
+        value = headers.get(key)
+        return int(value) if value and value.lstrip("-").isdigit() else -1
+    
+    @staticmethod
+    async def _read_error(resp: aiohttp.ClientResponse, response: OddsResponse):
+        """
+        Lit le début du corps d'erreur (ERROR_BODY_MAX_BYTES max).
+        
+        Le texte brut va dans `error` ; si le corps est du JSON complet,
+        son "error_code" est extrait dans `error_code`.
+        """
+        chunk = b""
+        while len(chunk) < ERROR_BODY_MAX_BYTES:
+            part = await resp.content.read(ERROR_BODY_MAX_BYTES - len(chunk))
+            if not part:
+                break
+            chunk += part
+        response.error = chunk.decode("utf-8", errors="replace")
+        
+        if resp.content_type == "application/json":
             try:
-                async with session.get(f"{self.BASE_URL}/{endpoint}", params=params) as resp:
-                    response = OddsResponse(
-                        success=resp.status == 200,
-                        status_code=resp.status,
-                        requests_remaining=int(resp.headers.get("x-requests-remaining", 0)),
-                        requests_used=int(resp.headers.get("x-requests-used", 0))
-                    )
-                    
-                    if resp.status == 200:
-                        response.data = await resp.json()
+                payload = _json_loads(chunk)
+            except ValueError:
+                return  # Corps tronqué ou invalide : on garde le texte brut
+            if isinstance(payload, dict) and payload.get("error_code"):
+                response.error_code = str(payload["error_code"])
+    
+    def _adapt_pacing(self, status: int, remaining: int, headers) -> None:
+        """
+        Ajuste le rythme des requêtes d'après les headers de l'API.
+        
+        - 429/5xx + Retry-After : suspend le limiteur pendant la durée indiquée
+        - x-requests-remaining : si quota_window_seconds est défini, répartit
+          le quota restant sur la fenêtre (jamais plus vite que le débit de base)
+        """
+        if status == 429 or status >= 500:
+            retry_after = headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                self._limiter.pause(int(retry_after))
+        
+        if not self.quota_window_seconds or remaining <= 0:
+            return
+        
+        # Délai minimal par requête imposé par le budget restant
+        budget_delay = self.quota_window_seconds / remaining
+        period = max(self._base_period, budget_delay * self._base_rate)
+        if period != self._limiter.time_period:
+            self._limiter.set_rate(self._base_rate, period)
+    
+    async def _fetch(
+        self,
+        endpoint: str,
+        params: Mapping,
+        etag: Optional[str] = None
+    ) -> OddsResponse:
+        """Effectue la requête GET réelle (admission + rate limiting inclus)."""
+        async with self._admission:
+            await self._admission.wait_for(lambda: self._active < self._max_concurrent)
+            self._active += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                # Respecter le débit autorisé (chaque tentative compte)
+                await self._limiter.acquire()
+                try:
+                    response = await self._send(endpoint, params, etag)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    response = OddsResponse(success=False, error=str(e) or type(e).__name__)
+                else:
+                    if response.status_code < 500:
+                        return response
+                
+                if attempt == self.max_retries:
+                    break
+                
+                # Erreur transitoire (réseau/5xx) : backoff exponentiel avec jitter
+                delay = self.retry_backoff * 2 ** attempt + random.random() * 0.1
+                logger.debug(
+                    "Erreur transitoire sur %s (%s), nouvel essai dans %.1fs",
+                    endpoint, response.status_code or response.error, delay
+                )
+                await asyncio.sleep(delay)
+            
+            return response
+        finally:
+            async with self._admission:
+                self._active -= 1
+                if self._active == 0:
+                    self._admission.notify_all()  # Réveille aussi un close() en attente
+                else:
+                    self._admission.notify(1)
+    
+    async def _send(
+        self,
+        endpoint: str,
+        params: Mapping,
+        etag: Optional[str] = None
+    ) -> OddsResponse:
+        """Envoie la requête HTTP et construit la réponse."""
+        session = await self._get_session()
+        
+        # Nouveau dict : le mapping de l'appelant n'est jamais modifié
+        query = {"apiKey": self.api_key, **params}
+        headers = {"If-None-Match": etag} if etag else None
+        
+        try:
+            async with session.get(self._base_url / endpoint, params=query, headers=headers) as resp:
+                response = OddsResponse(
+                    success=resp.status == 200,
+                    status_code=resp.status,
+                    requests_remaining=self._hint(resp.headers, "x-requests-remaining"),
+                    requests_used=self._hint(resp.headers, "x-requests-used"),
+                    etag=resp.headers.get("ETag"),
+                    retry_after=self._hint(resp.headers, "Retry-After")
+                )
+                
+                self._adapt_pacing(resp.status, response.requests_remaining, resp.headers)
+                
+                if resp.status == 200:
+                    body = await resp.read()
+                    if len(body) > LARGE_PAYLOAD_BYTES:
+                        response.data = await asyncio.get_running_loop().run_in_executor(
+                            None, _json_loads, body
+                        )
                     else:
-                        response.error = await resp.text()
-                    
-                    self._last_request_time = time.monotonic()
-                    return response
-                    
-            except Exception as e:
-                self._last_request_time = time.monotonic()
-                return OddsResponse(success=False, error=str(e))
+                        response.data = _json_loads(body)
+                elif resp.status == 304:
+                    pass  # Pas de corps : le cache fournit les données
+                else:
+                    await self._read_error(resp, response)
+                
+                return response
+                
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            raise  # Transitoire : réessayé par _fetch
+        except Exception as e:
+            return OddsResponse(success=False, error=str(e))
     
     async def get_sports(self, all_sports: bool = False) -> OddsResponse:
         """
@@ -133,9 +594,9 @@ class OddsClient:
         sport: str,
         regions: str = "eu",
         markets: str = "h2h",
-        bookmakers: list[str] = None,
+        bookmakers: Sequence[str] = None,
         odds_format: str = "decimal",
-        event_ids: list[str] = None
+        event_ids: Sequence[str] = None
     ) -> OddsResponse:
         """
         Récupère les cotes pour un sport (marchés de base).
@@ -161,10 +622,10 @@ class OddsClient:
         }
         
         if bookmakers:
-            params["bookmakers"] = ",".join(bookmakers)
+            params["bookmakers"] = self._csv(tuple(bookmakers))
         
         if event_ids:
-            params["eventIds"] = ",".join(event_ids)
+            params["eventIds"] = self._csv(tuple(event_ids))
         
         return await self._request(f"sports/{sport}/odds", params)
     
@@ -216,6 +677,37 @@ class OddsClient:
         }
         return await self._request(f"sports/{sport}/events/{event_id}/odds", params)
     
+    async def get_many_event_odds(
+        self,
+        sport: str,
+        event_ids: list[str],
+        *,
+        concurrency: int = MAX_PARALLEL_REQUESTS,
+        **kwargs
+    ) -> list[OddsResponse]:
+        """
+        Récupère les cotes de plusieurs événements en parallèle.
+        
+        Au plus `concurrency` requêtes en vol ; le limiteur de débit
+        continue de s'appliquer globalement.
+        
+        Args:
+            sport: Clé du sport
+            event_ids: IDs des événements
+            concurrency: Nombre max de requêtes simultanées
+            **kwargs: Transmis à get_event_odds (regions, markets, odds_format)
+        
+        Returns:
+            Réponses dans le même ordre que event_ids
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        async def one(event_id: str) -> OddsResponse:
+            async with sem:
+                return await self.get_event_odds(sport, event_id, **kwargs)
+        
+        return await asyncio.gather(*(one(event_id) for event_id in event_ids))
+    
     async def get_scores(self, sport: str, days_from: int = 1) -> OddsResponse:
         """Récupère les scores récents."""
         params = {"daysFrom": days_from}
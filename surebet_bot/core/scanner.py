@@ -2,18 +2,81 @@
 # Intègre le SmartScheduler pour un scan adaptatif
 
 import asyncio
+import logging
+import random
+import sys
 import threading
-from datetime import datetime, timedelta
+import time
+import aiohttp
+from datetime import datetime
 from typing import Optional
 from dataclasses import dataclass, field
-from collections import deque
+from collections import OrderedDict, defaultdict, deque
+from operator import itemgetter
 
 from core.odds_client import OddsClient
 from core.calculator import calculate_arbitrage, calculate_value_bets, SurebetResult, ValueBet
 from core.api_manager import APIManager
 from core.scheduler import SmartScheduler
 from notifications.telegram_bot import TelegramBot
-from constants import MIN_PROFIT_PCT, VALUE_BET_MIN_THRESHOLD, VALUE_BET_MIN_BOOKMAKERS, VALUE_BET_COOLDOWN_MINUTES
+from constants import (
+    MIN_PROFIT_PCT, VALUE_BET_MIN_THRESHOLD, VALUE_BET_MIN_BOOKMAKERS,
+    VALUE_BET_COOLDOWN_MINUTES, MAX_CONCURRENT_SCANS, LOW_QUOTA_THRESHOLD,
+)
+
+logger = logging.getLogger("surebet_bot.scanner")
+
+# Clé de tri des tuples (bookmaker, cote) : évite une lambda par appel à max()
+_PRICE = itemgetter(1)
+
+
+class BestOdds(list):
+    """Liste de (bookmaker, cote) qui suit la meilleure cote au fil des ajouts."""
+    
+    __slots__ = ("best_bk", "best_price")
+    
+    def __init__(self):
+        super().__init__()
+        self.best_bk: Optional[str] = None
+        self.best_price = 0.0
+    
+    def add(self, bookmaker: str, price: float):
+        """Ajoute une cote ; à égalité, le premier bookmaker reste le meilleur (comme max())."""
+        self.append((bookmaker, price))
+        if price > self.best_price:
+            self.best_price = price
+            self.best_bk = bookmaker
+
+
+# Les pré-filtres comparent sans division : pour des cotes > 0,
+# 1/a + 1/b < 1  <=>  a + b < a*b  (idem en 3 issues, multiplié par a*b*c)
+
+def _is_surebet_2way(a: float, b: float) -> bool:
+    """Pré-filtre 2 issues : arbitrage possible si 1/a + 1/b < 1."""
+    return a + b < a * b
+
+
+def _is_surebet_3way(a: float, b: float, c: float) -> bool:
+    """Pré-filtre 3 issues (1X2) : 1/a + 1/b + 1/c < 1."""
+    ab = a * b
+    return ab + (a + b) * c < ab * c
+
+
+def _could_be_surebet(odds: list) -> bool:
+    """Pré-filtre avant calculate_arbitrage, spécialisé pour 2 et 3 issues."""
+    n = len(odds)
+    if n == 2:
+        return _is_surebet_2way(odds[0], odds[1])
+    if n == 3:
+        return _is_surebet_3way(odds[0], odds[1], odds[2])
+    return sum(1.0 / o for o in odds) < 1.0
+
+
+def _best_odds(entries: list) -> tuple:
+    """(bookmaker, cote) maximale : lue directement si suivie à l'extraction."""
+    if type(entries) is BestOdds:
+        return entries.best_bk, entries.best_price
+    return max(entries, key=_PRICE)
 
 
 @dataclass
@@ -51,6 +114,15 @@ class SurebetScanner:
     (Over vs Under) au lieu des mêmes outcomes.
     """
     
+    # Granularité de la roue d'expiration du cooldown (secondes)
+    COOLDOWN_BUCKET_SECONDS = 30
+    # Taille max du cache des marchés extraits (événements)
+    EXTRACT_CACHE_SIZE = 4096
+    # Fenêtre de regroupement des erreurs identiques (secondes)
+    ERROR_COALESCE_SECONDS = 60
+    # Cotes brutes écrites en DB par paquets de cette taille pendant le scan d'un sport
+    RAW_ODDS_FLUSH_ROWS = 1000
+    
     def __init__(
         self,
         api_manager: APIManager,
@@ -60,7 +132,9 @@ class SurebetScanner:
         cooldown_minutes: int = 5,
         bookmakers: list[str] = None,
         request_delay: float = 3.0,
-        scheduler: SmartScheduler = None
+        scheduler: SmartScheduler = None,
+        max_concurrency: int = MAX_CONCURRENT_SCANS,
+        session: Optional[aiohttp.ClientSession] = None
     ):
         self.api_manager = api_manager
         self.telegram = telegram
@@ -69,16 +143,40 @@ class SurebetScanner:
         self.cooldown_minutes = cooldown_minutes
         self.bookmakers = bookmakers or []
         self.request_delay = request_delay
+        # Nombre max de sports scannés simultanément dans un cycle
+        self.max_concurrency = max(1, max_concurrency)
+        # Contrôle AIMD : concurrence effective dans [1, max_concurrency],
+        # +0.5 par réponse saine, x0.5 sur erreur de quota / quota bas.
+        # Le délai entre requêtes suit : base * max_concurrency / concurrence.
+        self._concurrency = float(self.max_concurrency)
+        self._base_request_delay = request_delay
         
         # Smart Scheduler (optionnel — fallback sur scan_interval fixe)
         self.scheduler = scheduler or SmartScheduler()
         
         self.client: Optional[OddsClient] = None
+        self._client_key: Optional[str] = None  # Clé active lors du dernier appel
+        # Session HTTP partagée par l'unique client HTTP
+        self.http_session = session
         self.running = False
-        # Limiter à 1000 surebets en mémoire pour éviter la croissance infinie
-        self.surebets_found: deque = deque(maxlen=1000)
-        self.cooldown_cache: dict[str, datetime] = {}
+        # Compteur total + historique récent léger (detected_at, match, profit %)
+        self.surebets_count = 0
+        self.recent_surebets: deque[tuple] = deque(maxlen=100)
+        # identifiant -> fin du cooldown (secondes time.monotonic())
+        self.cooldown_cache: dict[str, float] = {}
         self._cooldown_lock = threading.Lock()
+        # Roue temporelle d'expiration du cooldown : un bucket (set d'identifiants)
+        # par tranche de COOLDOWN_BUCKET_SECONDS, pour ne balayer que les
+        # entrées qui expirent au lieu de tout le cache à chaque scan
+        longest_cooldown = max(cooldown_minutes, VALUE_BET_COOLDOWN_MINUTES)
+        self._wheel_size = max(2, 2 * longest_cooldown * 60 // self.COOLDOWN_BUCKET_SECONDS)
+        self._wheel: list[set[str]] = [set() for _ in range(self._wheel_size)]
+        self._wheel_tick = self._tick(time.monotonic()) - 1  # Dernier bucket balayé
+        # Cache des marchés extraits : (id événement, last_update des bookmakers)
+        # -> (horodatage monotonic, marchés). Un événement inchangé n'est pas re-parsé.
+        self._extract_cache: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        # sport_key -> marchés demandés (stable : calculé une fois par sport)
+        self._markets_by_sport: dict[str, str] = {}
         
         # Stats
         self.scans_count = 0
@@ -86,44 +184,104 @@ class SurebetScanner:
         self.requests_remaining = 0
         self.errors_count = 0
         self.last_error = None
+        # Erreurs récentes : signature -> [premier signalement (monotonic), répétitions tues]
+        self._recent_errors: dict[str, list] = {}
         self.api_exhausted = False  # Flag pour arrêter si plus de clés
         
         # Retry logic avec backoff
         self.waiting_for_key = False
         self.retry_count = 0
         self.max_backoff_minutes = 10  # Max 10 minutes entre les retries
+        # Backoff "decorrelated jitter" : dernière attente (s) et Retry-After reçu
+        self._prev_wait = 0.0
+        self._retry_after_hint = -1
         self.force_stop = False  # Arrêt forcé via Telegram
+        # Signalé par request_stop/stop : interrompt immédiatement les attentes
+        self._stop_event = asyncio.Event()
+        # Récupération de clé en vol unique : le premier scan en erreur de quota
+        # fait le failover, les scans concurrents attendent son résultat
+        self._key_recovery_lock = asyncio.Lock()
+        self._key_recovery_done = asyncio.Event()
     
-    def _get_client(self) -> OddsClient:
-        """Crée/met à jour le client avec la clé active."""
+    def _get_client(self) -> Optional[OddsClient]:
+        """Retourne l'unique client (créé à la demande), ou None sans clé active.
+        
+        La clé est lue à chaque requête depuis l'APIManager : un failover ne
+        recrée pas le client et conserve son pool de connexions et son cache.
+        """
         key = self.api_manager.current_key
-        if self.client is None or self.client.api_key != key:
-            if self.client:
-                asyncio.create_task(self.client.close())
-            self.client = OddsClient(key, request_delay=self.request_delay)
+        if key is None:
+            return None
+        if self.client is None:
+            self.client = OddsClient(
+                None,
+                request_delay=self.request_delay,
+                session=self.http_session,
+                key_provider=lambda: self.api_manager.current_key
+            )
+        elif key != self._client_key:
+            # Nouvelle clé : la pause/le ralentissement de l'ancienne ne s'applique plus
+            self.client.reset_pacing()
+        self._client_key = key
         return self.client
     
-    def _check_and_add_cooldown(self, identifier: str) -> bool:
+    def _tick(self, when: float) -> int:
+        """Numéro absolu du bucket de la roue contenant l'instant monotonic `when`."""
+        return int(when) // self.COOLDOWN_BUCKET_SECONDS
+    
+    def _check_and_add_cooldown(
+        self,
+        identifier: str,
+        minutes: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> bool:
         """Vérifie le cooldown et l'ajoute atomiquement.
 
         Retourne True si l'opportunité est en cooldown (ne pas notifier),
         False si elle n'était pas en cooldown (cooldown ajouté, notifier).
+        `minutes` remplace la durée par défaut (cooldown_minutes) ;
+        `now` (time.monotonic()) évite de relire l'horloge si déjà connu.
         """
+        if now is None:
+            now = time.monotonic()
         with self._cooldown_lock:
             if identifier in self.cooldown_cache:
-                if datetime.now() <= self.cooldown_cache[identifier]:
+                if now <= self.cooldown_cache[identifier]:
                     return True  # En cooldown
                 del self.cooldown_cache[identifier]
-            self.cooldown_cache[identifier] = datetime.now() + timedelta(minutes=self.cooldown_minutes)
+            expires = now + 60 * (self.cooldown_minutes if minutes is None else minutes)
+            self.cooldown_cache[identifier] = expires
+            self._wheel[self._tick(expires) % self._wheel_size].add(identifier)
             return False
 
-    def _cleanup_cooldown_cache(self):
-        """Nettoie le cache de cooldown des entrées expirées."""
+    def _cleanup_cooldown_cache(self, now: Optional[float] = None):
+        """Nettoie le cache de cooldown des entrées expirées.
+
+        Seuls les buckets de la roue entièrement écoulés depuis le dernier
+        passage sont vidés : coût proportionnel aux entrées qui expirent.
+        """
+        if now is None:
+            now = time.monotonic()
         with self._cooldown_lock:
-            now = datetime.now()
-            expired = [key for key, expires in self.cooldown_cache.items() if now > expires]
-            for key in expired:
-                del self.cooldown_cache[key]
+            current = self._tick(now)
+            # Au-delà d'un tour complet, chaque bucket n'est visité qu'une fois
+            first = max(self._wheel_tick + 1, current - self._wheel_size)
+            for tick in range(first, current):
+                index = tick % self._wheel_size
+                bucket = self._wheel[index]
+                if not bucket:
+                    continue
+                self._wheel[index] = set()
+                for key in bucket:
+                    expires = self.cooldown_cache.get(key)
+                    if expires is None:
+                        continue  # Déjà expiré et retiré par _check_and_add_cooldown
+                    if now > expires:
+                        del self.cooldown_cache[key]
+                    else:
+                        # Prolongé ou prévu pour un tour suivant : re-planifier
+                        self._wheel[self._tick(expires) % self._wheel_size].add(key)
+            self._wheel_tick = max(self._wheel_tick, current - 1)
     
     async def _scan_sport(self, sport_key: str, sport_name: str, markets: str = "h2h,totals"):
         """
@@ -141,6 +299,7 @@ class SurebetScanner:
             self.api_exhausted = True
             return [], []
         
+        request_key = self.api_manager.current_key
         response = await client.get_odds(
             sport=sport_key,
             regions="eu,fr",
@@ -148,8 +307,11 @@ class SurebetScanner:
             bookmakers=self.bookmakers if self.bookmakers else None
         )
         
-        # Mettre à jour le quota
-        self.requests_remaining = response.requests_remaining
+        # Mettre à jour le quota (-1 = header absent : garder la dernière valeur connue)
+        if response.requests_remaining >= 0:
+            self.requests_remaining = response.requests_remaining
+        
+        self._adjust_concurrency(response)
         
         # Enregistrer l'usage API dans la DB
         await self._log_api_usage(response.requests_used, response.requests_remaining)
@@ -157,67 +319,46 @@ class SurebetScanner:
         # Gérer les erreurs API
         if not response.success:
             error_msg = f"API Error {response.status_code}: {response.error or 'Unknown'}"
-            print(f"[Scanner] ❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             
             # Détecter les erreurs de quota (plusieurs codes possibles)
             quota_error = (
                 response.status_code in [401, 402, 429] or
+                response.error_code == "OUT_OF_USAGE_CREDITS" or
                 "OUT_OF_USAGE_CREDITS" in (response.error or "") or
                 "quota" in (response.error or "").lower()
             )
             
             if quota_error:
-                old_key = self.api_manager.current_key
-                success = await self.api_manager.handle_api_error(
-                    response.status_code, 
-                    response.error or ""
-                )
-                
-                if success:
-                    new_key = self.api_manager.current_key
-                    await self.telegram.send_failover_notice(old_key, new_key)
-                    print(f"[Scanner] ✅ Failover réussi: {old_key[:8]}... → {new_key[:8]}...")
-                else:
-                    # Plus de clés disponibles - on attend et on réessaie
-                    await self._handle_error(
-                        f"⚠️ QUOTA API ÉPUISÉ!\n\n"
-                        f"Toutes les clés sont invalides.\n"
-                        f"Tentative de génération en cours...\n\n"
-                        f"Le bot réessaiera dans 5 minutes."
-                    )
-                    # NE PAS mettre api_exhausted = True, on va réessayer
-                    self.waiting_for_key = True
+                await self._recover_from_quota_error(response, request_key)
             else:
                 # Autre erreur - notifier sur Telegram
                 await self._handle_error(f"Erreur API ({sport_name}): {error_msg}")
 
             return [], []
         
+        from data.database import RawOddsBatch
+        
         surebets = []
         value_bets = []
-        raw_odds_batch = []  # Pour enregistrer toutes les cotes
-
-        for event in response.data or []:
-            match_name = f"{event['home_team']} vs {event['away_team']}"
-
-            # Collecter toutes les cotes par marché
-            markets_data = self._extract_markets(event)
+        # Cotes brutes en colonnes, vidées en DB tous les RAW_ODDS_FLUSH_ROWS
+        raw_odds_batch = RawOddsBatch()
 
-            # Enregistrer toutes les cotes brutes pour analyse
+        for match_name, markets_data in self._iter_events(response.data or []):
+            # Une seule passe par marché : cotes brutes pour la DB + détection
             for market_key, market_data in markets_data.items():
-                for outcome_name, bookmaker_odds in market_data.items():
+                for outcome_key, bookmaker_odds in market_data.items():
+                    # Libellé DB : "Over 2.5" pour les outcomes avec ligne
+                    outcome_name = (
+                        outcome_key if isinstance(outcome_key, str)
+                        else f"{outcome_key[0]} {outcome_key[1]}"
+                    )
                     for bookmaker, odds_value in bookmaker_odds:
-                        raw_odds_batch.append({
-                            "sport": sport_name,
-                            "match": match_name,
-                            "market": market_key,
-                            "bookmaker": bookmaker,
-                            "outcome": outcome_name,
-                            "odds": odds_value
-                        })
-
-            # Chercher les surebets pour chaque marché
-            for market_key, market_data in markets_data.items():
+                        raw_odds_batch.append(
+                            sport_name, match_name, market_key,
+                            bookmaker, outcome_name, odds_value
+                        )
+
                 surebet = self._find_arbitrage(
                     market_data=market_data,
                     market_key=market_key,
@@ -240,16 +381,107 @@ class SurebetScanner:
                 )
                 value_bets.extend(vbs)
 
-        # Sauvegarder toutes les cotes brutes dans la DB
+            # Mémoire bornée à un paquet : écriture au fil de l'eau
+            if len(raw_odds_batch) >= self.RAW_ODDS_FLUSH_ROWS:
+                await self._save_raw_odds_batch(raw_odds_batch)
+                raw_odds_batch.clear()
+
+        # Sauvegarder le reste des cotes brutes dans la DB
         await self._save_raw_odds_batch(raw_odds_batch)
 
         return surebets, value_bets
     
+    def _iter_events(self, events: list):
+        """Itère (nom du match, marchés extraits) pour chaque événement."""
+        for event in events:
+            yield (
+                f"{event['home_team']} vs {event['away_team']}",
+                self._extract_markets(event)
+            )
+    
+    async def _recover_from_quota_error(self, response, request_key: Optional[str]):
+        """Failover de clé après une erreur de quota, exécuté une seule fois.
+        
+        Les scans concurrents qui échouent pendant la récupération attendent
+        son issue au lieu de relancer un failover (et une notification).
+        """
+        if self._key_recovery_lock.locked():
+            await self._key_recovery_done.wait()
+            return
+        
+        async with self._key_recovery_lock:
+            self._key_recovery_done.clear()
+            try:
+                # Erreur obtenue avec une clé déjà remplacée : rien à faire
+                if self.waiting_for_key or self.api_manager.current_key != request_key:
+                    return
+                
+                # Indication du serveur pour le prochain retry (si fournie)
+                self._retry_after_hint = response.retry_after
+                old_key = self.api_manager.current_key
+                success = await self.api_manager.handle_api_error(
+                    response.status_code, 
+                    response.error or ""
+                )
+                
+                if success:
+                    new_key = self.api_manager.current_key
+                    await self.telegram.send_failover_notice(old_key, new_key)
+                    logger.info("✅ Failover réussi: %.8s... → %.8s...", old_key, new_key)
+                else:
+                    # Plus de clés disponibles - on attend et on réessaie
+                    await self._handle_error(
+                        f"⚠️ QUOTA API ÉPUISÉ!\n\n"
+                        f"Toutes les clés sont invalides.\n"
+                        f"Tentative de génération en cours...\n\n"
+                        f"Le bot réessaiera dans 5 minutes."
+                    )
+                    # NE PAS mettre api_exhausted = True, on va réessayer
+                    self.waiting_for_key = True
+            finally:
+                self._key_recovery_done.set()
+    
+    def _adjust_concurrency(self, response):
+        """Ajuste la concurrence (AIMD) selon la réponse de l'API."""
+        if response.status_code == 0:
+            return  # Erreur réseau : aucun signal de quota, pas de pas AIMD
+        previous = int(self._concurrency)
+        remaining = response.requests_remaining
+        
+        if response.status_code in (401, 402, 429) or 0 <= remaining < LOW_QUOTA_THRESHOLD:
+            # Diminution multiplicative : quota sous pression
+            self._concurrency = max(1.0, self._concurrency * 0.5)
+        elif response.success and remaining >= LOW_QUOTA_THRESHOLD:
+            # Augmentation additive : marge de quota confortable
+            self._concurrency = min(float(self.max_concurrency), self._concurrency + 0.5)
+        
+        if int(self._concurrency) != previous:
+            self.request_delay = (
+                self._base_request_delay * self.max_concurrency / int(self._concurrency)
+            )
+            if self.client:
+                self.client.set_request_delay(self.request_delay)
+    
     async def _handle_error(self, error_msg: str):
-        """Gère une erreur: log + notification Telegram."""
+        """Gère une erreur: log + notification Telegram.
+        
+        Les erreurs de même signature (texte avant le premier ":") sont
+        regroupées sur ERROR_COALESCE_SECONDS : seule la première est notifiée
+        et enregistrée, les suivantes sont comptées puis résumées.
+        """
         self.errors_count += 1
         self.last_error = error_msg
-        print(f"[Scanner] ❌ {error_msg}")
+        
+        now = time.monotonic()
+        await self._flush_error_summaries(now)
+        signature = error_msg.split(":", 1)[0]
+        entry = self._recent_errors.get(signature)
+        if entry is not None:
+            entry[1] += 1
+            logger.debug("❌ %s (répétition #%d)", error_msg, entry[1])
+            return
+        self._recent_errors[signature] = [now, 0]
+        logger.error("❌ %s", error_msg)
         
         # Envoyer sur Telegram
         await self.telegram.send_error(error_msg)
@@ -260,63 +492,95 @@ class SurebetScanner:
                 await self.db.add_log("ERROR", error_msg)
             except Exception as e:
                 # Logger l'erreur au lieu de l'ignorer silencieusement
-                print(f"[Scanner] ⚠️ Impossible d'enregistrer le log en DB: {e}")
+                logger.warning("⚠️ Impossible d'enregistrer le log en DB: %s", e)
+    
+    async def _flush_error_summaries(self, now: Optional[float] = None):
+        """Clôt les fenêtres d'erreurs expirées et résume les répétitions tues."""
+        if not self._recent_errors:
+            return
+        if now is None:
+            now = time.monotonic()
+        
+        expired = [
+            (signature, entry[1]) for signature, entry in self._recent_errors.items()
+            if now - entry[0] >= self.ERROR_COALESCE_SECONDS
+        ]
+        for signature, count in expired:
+            del self._recent_errors[signature]
+            if not count:
+                continue
+            summary = (
+                f"{count} erreur(s) identique(s) \"{signature}\" "
+                f"sur les {self.ERROR_COALESCE_SECONDS} dernières secondes"
+            )
+            logger.warning("🔁 %s", summary)
+            await self.telegram.send_error(summary)
+            if self.db:
+                try:
+                    await self.db.add_log("ERROR", summary)
+                except Exception as e:
+                    logger.warning("⚠️ Impossible d'enregistrer le log en DB: %s", e)
     
     async def _log_api_usage(self, used: int, remaining: int):
-        """Enregistre l'usage API dans la DB."""
-        if self.db and self.api_manager.current_key:
+        """Enregistre l'usage API dans la DB (quotas observés uniquement)."""
+        if used < 0 or remaining < 0:
+            return  # Quota inconnu (pas de headers) : ne pas tracer de fausse chute
+        short_key = self.api_manager.current_short_key
+        if self.db and short_key:
             try:
                 await self.db.log_api_usage(
-                    self.api_manager.current_key,
+                    short_key,
                     used,
                     remaining
                 )
             except Exception as e:
                 # Logger l'erreur au lieu de l'ignorer silencieusement
-                print(f"[Scanner] ⚠️ Impossible d'enregistrer l'usage API en DB: {e}")
+                logger.warning("⚠️ Impossible d'enregistrer l'usage API en DB: %s", e)
     
-    async def _save_raw_odds_batch(self, raw_odds_batch: list[dict]):
+    async def _save_raw_odds_batch(self, raw_odds_batch: "RawOddsBatch"):
         """Enregistre les cotes brutes dans la DB."""
         if self.db and raw_odds_batch:
             try:
                 await self.db.save_raw_odds_batch(raw_odds_batch)
-                print(f"[Scanner] 💾 {len(raw_odds_batch)} cotes enregistrées")
+                logger.debug("💾 %d cotes enregistrées", len(raw_odds_batch))
             except Exception as e:
-                # Logger l'erreur avec plus de détails
-                print(f"[Scanner] ⚠️ Erreur sauvegarde cotes: {e}")
-                import traceback
-                print(f"[Scanner] Traceback: {traceback.format_exc()}")
+                # Traceback inclus par logger.exception
+                logger.exception("⚠️ Erreur sauvegarde cotes: %s", e)
     
     async def _wait_and_retry_key_generation(self):
         """
         Attend avec backoff progressif et réessaie de générer une clé.
         
-        Backoff: 1min, 2min, 3min... jusqu'à 10min
-        Puis retry toutes les 10min indéfiniment.
+        Backoff "decorrelated jitter" : attente tirée entre 1 min et 3x la
+        précédente, plafonnée à max_backoff_minutes. Le jitter évite que
+        plusieurs instances partageant un pool de clés se synchronisent.
+        Un Retry-After renvoyé par l'API sert de minimum.
         """
         self.retry_count += 1
         
-        # Calculer le temps d'attente (1 à 10 min)
-        wait_minutes = min(self.retry_count, self.max_backoff_minutes)
-        wait_seconds = wait_minutes * 60
+        # Calculer le temps d'attente (1 à max_backoff_minutes)
+        base = 60.0
+        cap = self.max_backoff_minutes * 60.0
+        self._prev_wait = min(cap, random.uniform(base, max(base, self._prev_wait * 3)))
+        wait_seconds = max(self._prev_wait, self._retry_after_hint)
+        self._retry_after_hint = -1  # Indication consommée
+        wait_minutes = wait_seconds / 60
         
-        print(f"[Scanner] ⏳ Attente {wait_minutes} minute(s) avant retry #{self.retry_count}...")
+        logger.info("⏳ Attente %.1f minute(s) avant retry #%d...", wait_minutes, self.retry_count)
         await self.telegram.send_message(
             f"⏳ <b>Attente avant retry</b>\n\n"
             f"Retry #{self.retry_count}\n"
-            f"Attente: {wait_minutes} minute(s)\n\n"
+            f"Attente: {wait_minutes:.1f} minute(s)\n\n"
             f"Envoyez /stop pour arrêter le bot."
         )
         
-        # Attendre (vérifier force_stop toutes les 30s)
-        for _ in range(wait_seconds // 30):
-            if self.force_stop:
-                print("[Scanner] ⛔ Arrêt demandé via Telegram")
-                return False
-            await asyncio.sleep(30)
+        # Attendre (interrompu immédiatement par /stop)
+        if await self._wait_for_stop(wait_seconds):
+            logger.info("⛔ Arrêt demandé via Telegram")
+            return False
         
         # Réessayer de générer une clé
-        print(f"[Scanner] 🔄 Tentative de génération de clé #{self.retry_count}...")
+        logger.info("🔄 Tentative de génération de clé #%d...", self.retry_count)
         await self.telegram.send_message(f"🔄 Tentative de génération de clé #{self.retry_count}...")
         
         success = await self.api_manager.generate_new_key()
@@ -325,9 +589,11 @@ class SurebetScanner:
             self.api_manager.load_keys()
             self.waiting_for_key = False
             self.retry_count = 0
+            self._prev_wait = 0.0
+            self._retry_after_hint = -1
             
             new_key = self.api_manager.current_key
-            print(f"[Scanner] ✅ Nouvelle clé générée: {new_key[:8]}...")
+            logger.info("✅ Nouvelle clé générée: %.8s...", new_key)
             await self.telegram.send_message(
                 f"🎉 <b>Nouvelle clé API générée!</b>\n\n"
                 f"🔑 Clé: {new_key[:8]}...\n"
@@ -335,60 +601,106 @@ class SurebetScanner:
             )
             return True
         else:
-            print(f"[Scanner] ❌ Génération échouée, prochain retry dans {min(self.retry_count + 1, 10)} min")
+            logger.warning("❌ Génération échouée, nouvel essai après backoff")
+            return False
+    
+    async def _wait_for_stop(self, timeout: float) -> bool:
+        """Attend `timeout` secondes ; retourne True si l'arrêt a été demandé entre-temps."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
             return False
     
     def request_stop(self):
         """Demande l'arrêt du bot (appelé via Telegram)."""
         self.force_stop = True
         self.running = False
-        print("[Scanner] ⛔ Arrêt demandé")
+        self._stop_event.set()
+        logger.info("⛔ Arrêt demandé")
     
     def _extract_markets(self, event: dict) -> dict:
         """
         Extrait tous les marchés et cotes d'un événement.
         
+        Le résultat est mis en cache (LRU) par id d'événement + last_update
+        des bookmakers : il ne doit pas être modifié par l'appelant.
+        
         Returns:
             {
                 "h2h": {
-                    "Home Team": [(bookmaker, odds), ...],
+                    "Home Team": BestOdds[(bookmaker, odds), ...],
                     "Away Team": [(bookmaker, odds), ...],
                     "Draw": [(bookmaker, odds), ...]
                 },
                 "totals": {
-                    "Over 2.5": [(bookmaker, odds), ...],
-                    "Under 2.5": [(bookmaker, odds), ...]
+                    ("Over", 2.5): [(bookmaker, odds), ...],
+                    ("Under", 2.5): [(bookmaker, odds), ...]
+                },
+                "spreads": {
+                    ("Home Team", -1.5): [(bookmaker, odds), ...],
+                    ("Away Team", 1.5): [(bookmaker, odds), ...]
                 }
             }
+        
+        Les outcomes avec ligne (totals/spreads) sont indexés par le tuple
+        (nom, ligne) : pas de formatage/re-parsing de chaîne en aval.
+        Chaque liste est un BestOdds : la meilleure cote est connue sans max().
         """
+        # Événement inchangé depuis le dernier scan : réutiliser l'extraction
+        event_id = event.get("id")
+        cache_key = None
+        if event_id is not None:
+            cache_key = (
+                event_id,
+                tuple(b.get("last_update") for b in event.get("bookmakers", []))
+            )
+            cached = self._extract_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < self.scan_interval * 4:
+                self._extract_cache.move_to_end(cache_key)
+                return cached[1]
+        
         markets = {}
         
         for bookmaker in event.get("bookmakers", []):
-            bookmaker_name = bookmaker.get("title", "Unknown")
+            # Noms internés une fois ici : partagés par toutes les cotes brutes
+            bookmaker_name = sys.intern(bookmaker.get("title", "Unknown"))
             
             for market in bookmaker.get("markets", []):
-                market_key = market.get("key", "h2h")
+                market_key = sys.intern(market.get("key", "h2h"))
                 
                 if market_key not in markets:
                     markets[market_key] = {}
                 
                 for outcome in market.get("outcomes", []):
-                    # Construire le nom complet de l'outcome
+                    # Clé de l'outcome : nom seul, ou (nom, ligne) pour totals/spreads
                     name = outcome.get("name", "Unknown")
                     point = outcome.get("point")
                     
                     if point is not None:
-                        # Pour les totals/spreads, inclure la ligne
-                        full_name = f"{name} {point}"
+                        # Ligne numérique garantie dès ici ; outcome ignoré si illisible
+                        if not isinstance(point, (int, float)):
+                            try:
+                                point = float(point)
+                            except (TypeError, ValueError):
+                                continue
+                        full_name = (sys.intern(name), point)
                     else:
                         full_name = name
                     
                     price = outcome.get("price", 0)
                     
                     if price > 1:
-                        if full_name not in markets[market_key]:
-                            markets[market_key][full_name] = []
-                        markets[market_key][full_name].append((bookmaker_name, price))
+                        entries = markets[market_key].get(full_name)
+                        if entries is None:
+                            entries = markets[market_key][full_name] = BestOdds()
+                        entries.add(bookmaker_name, price)
+        
+        if cache_key is not None:
+            self._extract_cache[cache_key] = (time.monotonic(), markets)
+            self._extract_cache.move_to_end(cache_key)
+            if len(self._extract_cache) > self.EXTRACT_CACHE_SIZE:
+                self._extract_cache.popitem(last=False)
         
         return markets
     
@@ -430,30 +742,31 @@ class SurebetScanner:
         Trouve un arbitrage sur les totals (Over/Under).
         
         On cherche: Meilleure cote Over X + Meilleure cote Under X
-        où X est la même ligne (ex: 2.5 buts)
+        où X est la même ligne (ex: 2.5 buts).
+        market_data est indexé par (côté, ligne), ex: ("Over", 2.5).
         """
-        # Regrouper par ligne
-        lines = {}
-        for outcome_name, bookmaker_odds in market_data.items():
-            parts = outcome_name.split()
-            if len(parts) >= 2:
-                side = parts[0]  # Over ou Under
-                line = parts[1]  # 2.5
-                
-                if line not in lines:
-                    lines[line] = {"Over": [], "Under": []}
-                
-                if side in lines[line]:
-                    lines[line][side].extend(bookmaker_odds)
+        # Meilleure cote par (ligne, côté) en une passe, clés (côté, ligne)
+        lines = defaultdict(dict)
+        for (side, line), bookmaker_odds in market_data.items():
+            if side not in ("Over", "Under") or not bookmaker_odds:
+                continue
+            
+            sides = lines[line]
+            best = _best_odds(bookmaker_odds)
+            if side not in sides or best[1] > sides[side][1]:
+                sides[side] = best
         
         # Trouver la ligne la plus profitable parmi toutes les lignes en arbitrage
         best_line = None  # (line, result, best_over, best_under)
         for line, sides in lines.items():
-            if not sides["Over"] or not sides["Under"]:
+            best_over = sides.get("Over")
+            best_under = sides.get("Under")
+            if best_over is None or best_under is None:
+                continue
+            
+            # Pré-filtre : pas d'arbitrage si la somme des inverses >= 1
+            if not _is_surebet_2way(best_over[1], best_under[1]):
                 continue
-
-            best_over = max(sides["Over"], key=lambda x: x[1])
-            best_under = max(sides["Under"], key=lambda x: x[1])
 
             result = calculate_arbitrage([best_over[1], best_under[1]])
 
@@ -496,27 +809,29 @@ class SurebetScanner:
         Pour 3-way (football): Home + Draw + Away
         Pour 2-way (tennis, etc.): Home + Away
         """
-        outcomes = list(market_data.keys())
+        if len(market_data) < 2:
+            return None
         
-        if len(outcomes) < 2:
+        # Meilleure cote (bookmaker, cote) pour chaque outcome
+        bests = [
+            (outcome, _best_odds(entries))
+            for outcome, entries in market_data.items() if entries
+        ]
+        
+        if len(bests) < 2:
             return None
         
-        # Prendre la meilleure cote pour chaque outcome
-        best_odds = []
-        for outcome in outcomes:
-            if market_data[outcome]:
-                best = max(market_data[outcome], key=lambda x: x[1])
-                best_odds.append({
-                    "name": outcome,
-                    "bookmaker": best[0],
-                    "odds": best[1]
-                })
-        
-        if len(best_odds) < 2:
+        # Pré-filtre : pas d'arbitrage si la somme des inverses >= 1
+        odds_values = [best[1] for _, best in bests]
+        if not _could_be_surebet(odds_values):
             return None
         
+        best_odds = [
+            {"name": outcome, "bookmaker": best[0], "odds": best[1]}
+            for outcome, best in bests
+        ]
+        
         # Calculer l'arbitrage avec toutes les issues
-        odds_values = [b["odds"] for b in best_odds]
         result = calculate_arbitrage(odds_values)
         
         if result.is_surebet and result.profit_pct >= MIN_PROFIT_PCT:
@@ -550,49 +865,36 @@ class SurebetScanner:
         """
         Trouve un arbitrage sur les spreads (handicaps).
         
-        Les spreads sont symétriques: +1.5 pour l'un = -1.5 pour l'autre
+        Les spreads sont symétriques: +1.5 pour l'un = -1.5 pour l'autre.
+        market_data est indexé par (équipe, handicap numérique), ex: ("PSG", 1.5).
         """
-        # Regrouper par ligne absolue
-        lines = {}
-        for outcome_name, bookmaker_odds in market_data.items():
-            parts = outcome_name.rsplit(" ", 1)
-            if len(parts) >= 2:
-                team = parts[0]
-                try:
-                    handicap = float(parts[1])
-                    line_key = abs(handicap)
-                    
-                    if line_key not in lines:
-                        lines[line_key] = {}
-                    
-                    if team not in lines[line_key]:
-                        lines[line_key][team] = []
-                    
-                    lines[line_key][team].extend(bookmaker_odds)
-                except ValueError:
-                    continue
+        # Meilleure cote par ligne absolue et équipe, clés (équipe, handicap float)
+        lines = defaultdict(dict)
+        for (team, handicap), bookmaker_odds in market_data.items():
+            if not bookmaker_odds:
+                continue
+            teams = lines[abs(handicap)]
+            best = _best_odds(bookmaker_odds)
+            current = teams.get(team)
+            if current is None or best[1] > current[1]:
+                teams[team] = best
         
         # Trouver le spread le plus profitable parmi tous les spreads en arbitrage
         best_spread = None  # (line, result, best_odds)
         for line, teams in lines.items():
-            team_names = list(teams.keys())
-            if len(team_names) < 2:
+            if len(teams) < 2:
                 continue
 
-            best_odds = []
-            for team in team_names:
-                if teams[team]:
-                    best = max(teams[team], key=lambda x: x[1])
-                    best_odds.append({
-                        "name": team,
-                        "bookmaker": best[0],
-                        "odds": best[1]
-                    })
-
-            if len(best_odds) < 2:
+            # Pré-filtre : pas d'arbitrage si la somme des inverses >= 1
+            odds_values = [best[1] for best in teams.values()]
+            if not _could_be_surebet(odds_values):
                 continue
 
-            odds_values = [b["odds"] for b in best_odds]
+            best_odds = [
+                {"name": team, "bookmaker": best[0], "odds": best[1]}
+                for team, best in teams.items()
+            ]
+
             result = calculate_arbitrage(odds_values)
 
             if result.is_surebet and result.profit_pct >= MIN_PROFIT_PCT:
@@ -672,14 +974,8 @@ class SurebetScanner:
 
             for vb in value_bets:
                 identifier = f"vb_{match}_{market_key}_{outcome_name}_{vb.bookmaker}"
-                with self._cooldown_lock:
-                    if identifier in self.cooldown_cache:
-                        if datetime.now() <= self.cooldown_cache[identifier]:
-                            continue
-                        del self.cooldown_cache[identifier]
-                    self.cooldown_cache[identifier] = (
-                        datetime.now() + timedelta(minutes=VALUE_BET_COOLDOWN_MINUTES)
-                    )
+                if self._check_and_add_cooldown(identifier, VALUE_BET_COOLDOWN_MINUTES):
+                    continue
                 opportunities.append(ValueBetOpportunity(
                     sport=sport, league=league, match=match,
                     market=market_key, value_bet=vb
@@ -725,9 +1021,13 @@ class SurebetScanner:
             bookmakers_count=vb.bookmakers_count
         ))
 
-    async def _notify_surebet(self, surebet: SurebetOpportunity):
-        """Envoie une notification pour un surebet."""
-        await self.telegram.send_surebet_alert(
+    # Au-delà, les surebets d'un scan partent dans un seul message récapitulatif
+    DIGEST_MIN_SUREBETS = 3
+    
+    @staticmethod
+    def _surebet_alert_kwargs(surebet: SurebetOpportunity) -> dict:
+        """Arguments de TelegramBot.send_surebet_alert pour un surebet."""
+        return dict(
             sport=surebet.sport,
             league=surebet.league,
             match=surebet.match,
@@ -739,18 +1039,37 @@ class SurebetScanner:
             detected_at=surebet.detected_at.strftime("%H:%M:%S")
         )
     
-    async def _save_surebet(self, surebet: SurebetOpportunity):
-        """Sauvegarde un surebet en base de données."""
+    async def _notify_surebet(self, surebet: SurebetOpportunity):
+        """Envoie une notification pour un surebet."""
+        await self.telegram.send_surebet_alert(**self._surebet_alert_kwargs(surebet))
+    
+    async def _notify_surebets(self, surebets: list[SurebetOpportunity]):
+        """Notifie les surebets d'un scan : un message chacun, ou un récapitulatif."""
+        if len(surebets) < self.DIGEST_MIN_SUREBETS:
+            for surebet in surebets:
+                await self._notify_surebet(surebet)
+            return
+        await self.telegram.send_surebets_digest(
+            [self._surebet_alert_kwargs(s) for s in surebets],
+            detected_at=surebets[0].detected_at.strftime("%H:%M:%S")
+        )
+    
+    async def _save_surebets(self, surebets: list[SurebetOpportunity]):
+        """Sauvegarde les surebets d'un scan en une seule écriture."""
         if not self.db:
             return
-        
+        await self.db.save_surebets_many([self._surebet_record(s) for s in surebets])
+    
+    @staticmethod
+    def _surebet_record(surebet: SurebetOpportunity) -> "SurebetRecord":
+        """Convertit un surebet en ligne de la table surebets."""
         from data.database import SurebetRecord
         
         # Prendre les 2 premiers outcomes pour la DB
         o1 = surebet.outcomes[0] if len(surebet.outcomes) > 0 else {}
         o2 = surebet.outcomes[1] if len(surebet.outcomes) > 1 else {}
         
-        record = SurebetRecord(
+        return SurebetRecord(
             id=None,
             detected_at=surebet.detected_at,
             sport=surebet.sport,
@@ -764,48 +1083,76 @@ class SurebetScanner:
             profit_pct=surebet.result.profit_pct,
             profit_base_100=surebet.result.profit_base_100
         )
-        
-        await self.db.save_surebet(record)
+    
+    @staticmethod
+    def _sport_markets(sport_key: str) -> str:
+        """Marchés à demander pour un sport."""
+        if "soccer" in sport_key:
+            return "h2h,totals"
+        if "basketball" in sport_key or "football" in sport_key:
+            return "h2h,spreads,totals"
+        return "h2h"
     
     async def scan_once(self, sports: dict[str, str]):
         """Effectue un scan complet avec priorisation dynamique."""
         self.scans_count += 1
-        # Nettoyer le cache de cooldown avant chaque scan
-        self._cleanup_cooldown_cache()
+        # Nettoyer le cache de cooldown avant chaque scan (horloge lue une fois)
+        self._cleanup_cooldown_cache(time.monotonic())
         all_surebets = []
         all_value_bets = []
 
         # Prioriser les sports via le scheduler
         prioritized_sports = self.scheduler.prioritize_sports(sports)
 
-        for sport_key, sport_name in prioritized_sports.items():
-            # Vérifier si on doit arrêter
-            if self.waiting_for_key or self.force_stop:
-                print(f"[Scanner] ⛔ Pause du scan")
-                break
+        # Vérifier si on doit arrêter
+        if self.waiting_for_key or self.force_stop:
+            logger.debug("⛔ Pause du scan")
+            return all_surebets
 
-            try:
-                # Déterminer les marchés selon le sport
-                if "soccer" in sport_key:
-                    markets = "h2h,totals"
-                elif "basketball" in sport_key or "football" in sport_key:
-                    markets = "h2h,spreads,totals"
-                else:
-                    markets = "h2h"
+        # Les sports sont scannés en parallèle (borné par un sémaphore dimensionné
+        # par le contrôle AIMD) : la durée d'un cycle devient ~max des latences
+        # au lieu de leur somme. Le rythme des appels API reste imposé par le
+        # rate limit d'OddsClient.
+        sem = asyncio.Semaphore(int(self._concurrency))
 
-                surebets, value_bets = await self._scan_sport(sport_key, sport_name, markets)
-                all_surebets.extend(surebets)
-                all_value_bets.extend(value_bets)
+        async def _bounded(sport_key: str, sport_name: str, markets: str):
+            async with sem:
+                # Quota épuisé ou /stop pendant le cycle : les sports encore
+                # en attente sont abandonnés sans appel API
+                if self.waiting_for_key or self.force_stop:
+                    return [], []
+                return await self._scan_sport(sport_key, sport_name, markets)
 
-            except Exception as e:
-                error_msg = f"Exception scan {sport_key}: {e}"
+        tasks = []
+        for sport_key, sport_name in prioritized_sports.items():
+            # Marchés du sport : table précalculée (remplie à la volée si besoin)
+            markets = self._markets_by_sport.get(sport_key)
+            if markets is None:
+                markets = self._markets_by_sport[sport_key] = self._sport_markets(sport_key)
+            tasks.append(_bounded(sport_key, sport_name, markets))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for sport_key, result in zip(prioritized_sports, results):
+            if isinstance(result, Exception):
+                error_msg = f"Exception scan {sport_key}: {result}"
                 await self._handle_error(error_msg)
+                continue
 
-        # Notifier et sauvegarder les nouveaux surebets
-        for surebet in all_surebets:
-            self.surebets_found.append(surebet)
-            await self._notify_surebet(surebet)
-            await self._save_surebet(surebet)
+            surebets, value_bets = result
+            all_surebets.extend(surebets)
+            all_value_bets.extend(value_bets)
+
+        # Notifier et sauvegarder les nouveaux surebets (en lot, en parallèle)
+        if all_surebets:
+            self.surebets_count += len(all_surebets)
+            self.recent_surebets.extend(
+                (s.detected_at, s.match, s.result.profit_pct) for s in all_surebets
+            )
+            await asyncio.gather(
+                self._notify_surebets(all_surebets),
+                self._save_surebets(all_surebets)
+            )
 
         # Notifier et sauvegarder les value bets
         for opp in all_value_bets:
@@ -832,87 +1179,94 @@ class SurebetScanner:
         self.api_exhausted = False
         self.waiting_for_key = False
         self.force_stop = False
+        self._stop_event.clear()
         self.retry_count = 0
+        self._prev_wait = 0.0
+        
+        # Marchés par sport calculés une fois pour toute la session
+        self._markets_by_sport = {k: self._sport_markets(k) for k in sports}
         
-        # Intervalle dynamique via scheduler
+        # Intervalle dynamique via scheduler (refresh initialise aussi la
+        # détection de changement de créneau)
+        self.scheduler.refresh()
         current_interval = self.scheduler.get_scan_interval()
         slot_name, slot_config = self.scheduler.get_current_slot()
         
-        print(f"Scanner démarré - Créneau: {slot_config['label']} ({current_interval}s)")
-        print(f"Sports à scanner: {len(sports)}")
-        print(f"Clé API active: {self.api_manager.current_key[:8] if self.api_manager.current_key else 'AUCUNE'}...")
+        logger.info("Scanner démarré - Créneau: %s (%ss)", slot_config['label'], current_interval)
+        logger.info("Sports à scanner: %d", len(sports))
+        logger.info("Clé API active: %.8s...", self.api_manager.current_key or "AUCUNE")
         
-        # Configurer les callbacks pour les commandes Telegram
+        # Configurer les callbacks pour les commandes Telegram, écoutées en
+        # tâche de fond (long polling) plutôt qu'à chaque tour de boucle
         self.telegram.set_callbacks(
             stop_callback=self.request_stop,
             status_callback=self.get_stats
         )
+        self.telegram.start_command_listener()
         
-        # Message de démarrage avec info scheduler
-        await self.telegram.send_message(
-            f"🟢 <b>Bot Surebet démarré!</b>\n\n"
-            f"📊 Sports: {len(sports)}\n"
-            f"🔑 Clés API: {self.api_manager.valid_keys_count}\n\n"
-            f"{self.scheduler.get_status_message()}\n\n"
-            f"Commandes: /stop /status /help"
-        )
-        
-        # Initialiser la détection de changement de créneau
-        self.scheduler.has_slot_changed()
-        
-        while self.running and not self.force_stop:
-            # Vérifier les commandes Telegram
-            await self.telegram.handle_commands()
-            
-            if self.force_stop:
-                break
-            
-            # ── Détection changement de créneau ──
-            changed, old_slot, new_slot = self.scheduler.has_slot_changed()
-            if changed and old_slot is not None:
-                msg = self.scheduler.get_slot_change_message(old_slot, new_slot)
-                await self.telegram.send_message(msg)
-                print(f"[Scheduler] 🔄 Créneau: {old_slot} → {new_slot}")
-            
-            # Mettre à jour l'intervalle dynamique
-            current_interval = self.scheduler.get_scan_interval()
-            
-            # Si on attend une nouvelle clé, faire le retry avec backoff
-            if self.waiting_for_key:
-                success = await self._wait_and_retry_key_generation()
-                if not success and not self.force_stop:
-                    # Continue à réessayer
-                    continue
-                elif self.force_stop:
-                    break
-                # Sinon, on a une nouvelle clé, on reprend le scan
+        try:
+            # Message de démarrage avec info scheduler
+            await self.telegram.send_message(
+                f"🟢 <b>Bot Surebet démarré!</b>\n\n"
+                f"📊 Sports: {len(sports)}\n"
+                f"🔑 Clés API: {self.api_manager.valid_keys_count}\n\n"
+                f"{self.scheduler.get_status_message()}\n\n"
+                f"Commandes: /stop /status /help"
+            )
             
-            try:
-                surebets = await self.scan_once(sports)
-                
-                if surebets:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] 🎯 {len(surebets)} surebet(s) trouvé(s)!")
-                else:
-                    slot_label = self.scheduler.get_current_slot()[1]['label']
-                    print(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] "
-                        f"Scan #{self.scans_count} - {slot_label} - "
-                        f"API: {self.requests_remaining} restantes - "
-                        f"Intervalle: {current_interval}s"
-                    )
+            while self.running and not self.force_stop:
+                # ── Détection changement de créneau (heure lue une fois par tour) ──
+                changed, old_slot, new_slot = self.scheduler.refresh()
+                if changed and old_slot is not None:
+                    msg = self.scheduler.get_slot_change_message(old_slot, new_slot)
+                    await self.telegram.send_message(msg)
+                    logger.info("🔄 Créneau: %s → %s", old_slot, new_slot)
                 
-                # Alerte si quota bas
-                if self.requests_remaining > 0 and self.requests_remaining < 50:
-                    await self.telegram.send_api_warning(
-                        self.requests_remaining,
-                        self.api_manager.current_key or "N/A"
-                    )
+                # Mettre à jour l'intervalle dynamique
+                current_interval = self.scheduler.get_scan_interval()
                 
-                await asyncio.sleep(current_interval)
+                # Si on attend une nouvelle clé, faire le retry avec backoff
+                if self.waiting_for_key:
+                    success = await self._wait_and_retry_key_generation()
+                    if not success and not self.force_stop:
+                        # Continue à réessayer
+                        continue
+                    elif self.force_stop:
+                        break
+                    # Sinon, on a une nouvelle clé, on reprend le scan
                 
-            except Exception as e:
-                await self._handle_error(f"Exception boucle principale: {e}")
-                await asyncio.sleep(current_interval)
+                try:
+                    surebets = await self.scan_once(sports)
+                    # Résumé des erreurs répétées dont la fenêtre est close
+                    await self._flush_error_summaries()
+                    
+                    # L'horodatage est ajouté par le formatter du logger
+                    if surebets:
+                        logger.info("🎯 %d surebet(s) trouvé(s)!", len(surebets))
+                    elif logger.isEnabledFor(logging.DEBUG):
+                        # Lookup du créneau uniquement si le message sera émis
+                        slot_label = self.scheduler.get_stats()['slot_label']
+                        logger.debug(
+                            "Scan #%d - %s - API: %d restantes - Intervalle: %ss",
+                            self.scans_count, slot_label,
+                            self.requests_remaining, current_interval
+                        )
+                    
+                    # Alerte si quota bas
+                    if self.requests_remaining > 0 and self.requests_remaining < 50:
+                        await self.telegram.send_api_warning(
+                            self.requests_remaining,
+                            self.api_manager.current_key or "N/A"
+                        )
+                    
+                    await self._wait_for_stop(current_interval)
+                    
+                except Exception as e:
+                    await self._handle_error(f"Exception boucle principale: {e}")
+                    await self._wait_for_stop(current_interval)
+        finally:
+            # Ne pas laisser fuir la tâche d'écoute si la boucle lève
+            await self.telegram.stop_command_listener()
         
         # Message de fin avec stats scheduler
         if self.force_stop:
@@ -920,7 +1274,7 @@ class SurebetScanner:
             await self.telegram.send_message(
                 f"⛔ <b>Bot arrêté sur demande</b>\n\n"
                 f"Scans effectués: {self.scans_count}\n"
-                f"Surebets trouvés: {len(self.surebets_found)}\n"
+                f"Surebets trouvés: {self.surebets_count}\n"
                 f"Erreurs: {self.errors_count}\n\n"
                 f"📊 <b>Scheduler:</b>\n"
                 f"Changements de créneau: {sched_stats['slot_changes']}\n"
@@ -932,6 +1286,7 @@ class SurebetScanner:
     async def stop(self):
         """Arrête le scanner."""
         self.running = False
+        self._stop_event.set()
         if self.client:
             await self.client.close()
         await self.telegram.send_message("🔴 <b>Bot Surebet arrêté</b>")
@@ -948,9 +1303,9 @@ class SurebetScanner:
         stats = {
             "uptime": uptime,
             "scans_count": self.scans_count,
-            "surebets_found": len(self.surebets_found),
+            "surebets_found": self.surebets_count,
             "requests_remaining": self.requests_remaining,
-            "api_key": self.api_manager.current_key[:8] + "..." if self.api_manager.current_key else None,
+            "api_key": self.api_manager.current_short_key,
             "valid_keys": self.api_manager.valid_keys_count,
         }
         
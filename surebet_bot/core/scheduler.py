@@ -7,8 +7,18 @@
 # ================================================================
 
 import fnmatch
+import re
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Optional
+
+# hyperscan (optionnel) : DFA multi-patterns, rentable seulement sur de gros jeux de patterns
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 from constants import (
     SCHEDULE_SLOTS,
@@ -18,6 +28,96 @@ from constants import (
 )
 
 
+def _build_slot_table() -> list[tuple[str, dict]]:
+    """
+    Créneau actif pour chacune des 168 heures de la semaine,
+    indexé par weekday * 24 + hour (résolution SLOT_PRIORITY rejouée une fois).
+    """
+    # (nom, config, jours, heures) dans l'ordre de priorité, lus une seule fois
+    slots_items = [
+        (name, SCHEDULE_SLOTS[name], SCHEDULE_SLOTS[name]["days"], SCHEDULE_SLOTS[name]["hours"])
+        for name in SLOT_PRIORITY
+    ]
+    # Fallback (ne devrait jamais arriver car "default" couvre 0-24)
+    fallback = ("default", SCHEDULE_SLOTS["default"])
+
+    table = []
+    for weekday in range(7):
+        for hour in range(24):
+            entry = fallback
+            for slot_name, slot, days, (start_h, end_h) in slots_items:
+                if weekday in days and start_h <= hour < end_h:
+                    entry = (slot_name, slot)
+                    break
+            table.append(entry)
+    return table
+
+
+_SLOT_TABLE = _build_slot_table()
+
+
+def _regex_matcher(patterns: list[str]) -> Callable[[str], Optional[int]]:
+    """
+    Patterns fnmatch combinés en une regex (groupe nommé p<i>) : l'alternance
+    essaie les patterns dans l'ordre, lastgroup donne le premier correspondant.
+    """
+    combined = re.compile("|".join(
+        f"(?P<p{i}>{fnmatch.translate(p)})" for i, p in enumerate(patterns)
+    ))
+
+    def first_match(sport_key: str) -> Optional[int]:
+        m = combined.match(sport_key)
+        return int(m.lastgroup[1:]) if m is not None else None
+
+    return first_match
+
+
+def _hyperscan_matcher(patterns: list[str]) -> Optional[Callable[[str], Optional[int]]]:
+    """
+    Patterns fnmatch compilés en une base hyperscan (id = rang du pattern).
+    Retourne None si un pattern n'est pas supporté (repli sur la regex).
+    """
+    n = len(patterns)
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[("^" + fnmatch.translate(p)).encode() for p in patterns],
+            ids=list(range(n)),
+            elements=n,
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_DOTALL] * n,
+        )
+    except hyperscan.error:
+        return None
+
+    def first_match(sport_key: str) -> Optional[int]:
+        hits = []
+        db.scan(
+            sport_key.encode(),
+            match_event_handler=lambda pattern_id, *_: hits.append(pattern_id)
+        )
+        # Plusieurs patterns peuvent correspondre : garder le plus prioritaire
+        return min(hits) if hits else None
+
+    return first_match
+
+
+def _memoized(matcher: Callable[[str], Optional[int]]) -> Callable[[str], Optional[int]]:
+    """
+    Mémoïse un matcher par sport_key : l'ensemble des sports de l'API est
+    petit et stable, chaque clé n'est testée contre les patterns qu'une fois.
+    """
+    results: dict[str, Optional[int]] = {}
+
+    def first_match(sport_key: str) -> Optional[int]:
+        try:
+            return results[sport_key]
+        except KeyError:
+            index = results[sport_key] = matcher(sport_key)
+            return index
+
+    return first_match
+
+
 class SmartScheduler:
     """
     Scheduler intelligent qui adapte le scan en temps réel.
@@ -30,6 +130,16 @@ class SmartScheduler:
     - Notifie les changements de créneau
     """
 
+    # Taille max de la mémoire des matchs déjà notifiés
+    NOTIFIED_MATCHES_MAX = 10_000
+    # Nombre de patterns à partir duquel hyperscan (si installé) remplace la regex
+    HYPERSCAN_MIN_PATTERNS = 32
+    # Nombre d'événements à partir duquel on filtre sur les chaînes brutes
+    # (en dessous, formater les bornes coûte plus que parser quelques dates)
+    STRING_BOUNDS_MIN_EVENTS = 8
+    # Format des commence_time de The Odds API
+    _API_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
     def __init__(self, now_func=None):
         """
         Args:
@@ -38,8 +148,17 @@ class SmartScheduler:
         """
         self._now_func = now_func or datetime.now
         self._current_slot_name: Optional[str] = None
+        # Créneau figé par refresh() pour les lectures (None = calcul à la volée)
+        self._slot: Optional[tuple[str, dict]] = None
+        # Incrémenté à chaque changement de créneau : invalide les caches dérivés
+        self._slot_generation = 0
+        # Dernière priorisation : (génération, sports en entrée, résultat, nb de sports)
+        self._prioritized_cache: Optional[tuple[int, dict, dict, int]] = None
         self._slot_change_count = 0
-        self._notified_matches: set[str] = set()
+        # event_id -> date de notification, du plus ancien au plus récent
+        self._notified_matches: OrderedDict[str, datetime] = OrderedDict()
+        # Par créneau : sport_key -> index du premier pattern correspondant (ou None)
+        self._pattern_cache: dict[str, Callable[[str], Optional[int]]] = {}
 
     @property
     def now(self) -> datetime:
@@ -53,25 +172,32 @@ class SmartScheduler:
         Détermine le créneau temporel actif.
 
         Évalue les créneaux dans l'ordre de SLOT_PRIORITY.
-        Le premier créneau correspondant à jour+heure est retourné.
+        Le premier créneau correspondant à jour+heure est retourné
+        (précalculé pour les 168 heures de la semaine dans _SLOT_TABLE).
 
         Returns:
             (slot_name, slot_config) — ex: ("live_weekend", {...})
         """
         now = self.now
-        weekday = now.weekday()  # 0=lundi, 6=dimanche
-        hour = now.hour
+        # weekday: 0=lundi, 6=dimanche ; une seule lecture de chaque attribut
+        weekday, hour = now.weekday(), now.hour
+        return _SLOT_TABLE[weekday * 24 + hour]
 
-        for slot_name in SLOT_PRIORITY:
-            slot = SCHEDULE_SLOTS[slot_name]
+    def refresh(self) -> tuple[bool, Optional[str], Optional[str]]:
+        """
+        Relit l'heure et fige le créneau courant pour les lectures suivantes
+        (intervalle, priorisation, stats), à appeler une fois par itération.
 
-            if weekday in slot["days"]:
-                start_h, end_h = slot["hours"]
-                if start_h <= hour < end_h:
-                    return slot_name, slot
+        Returns:
+            (changed, old_slot_name, new_slot_name) — voir has_slot_changed
+        """
+        self._slot = self.get_current_slot()
+        return self.has_slot_changed()
 
-        # Fallback (ne devrait jamais arriver car "default" couvre 0-24)
-        return "default", SCHEDULE_SLOTS["default"]
+    def _active_slot(self) -> tuple[str, dict]:
+        """Créneau figé par le dernier refresh(), sinon calculé à l'instant."""
+        slot = self._slot
+        return slot if slot is not None else self.get_current_slot()
 
     def has_slot_changed(self) -> tuple[bool, Optional[str], Optional[str]]:
         """
@@ -80,17 +206,19 @@ class SmartScheduler:
         Returns:
             (changed, old_slot_name, new_slot_name)
         """
-        new_name, _ = self.get_current_slot()
+        new_name, _ = self._active_slot()
 
         if self._current_slot_name is None:
             # Premier appel
             self._current_slot_name = new_name
+            self._slot_generation += 1
             return True, None, new_name
 
         if new_name != self._current_slot_name:
             old = self._current_slot_name
             self._current_slot_name = new_name
             self._slot_change_count += 1
+            self._slot_generation += 1
             return True, old, new_name
 
         return False, self._current_slot_name, self._current_slot_name
@@ -102,7 +230,7 @@ class SmartScheduler:
         Retourne l'intervalle de scan optimal (en secondes)
         pour le créneau actuel.
         """
-        _, slot = self.get_current_slot()
+        _, slot = self._active_slot()
         return slot["scan_interval"]
 
     # ── Priorisation des sports ──────────────────────────────
@@ -118,24 +246,53 @@ class SmartScheduler:
             sports: {sport_key: display_name} — ex: {"soccer_epl": "Premier League"}
 
         Returns:
-            Nouveau dict trié par priorité
+            Nouveau dict trié par priorité (partagé entre appels tant que le
+            créneau ne change pas : ne pas le modifier)
         """
-        slot_name, _ = self.get_current_slot()
+        # Créneau figé par refresh() : le résultat ne dépend que de la
+        # génération du créneau et des sports (même dict, non modifié)
+        cached = self._prioritized_cache
+        if (
+            self._slot is not None and cached is not None
+            and cached[0] == self._slot_generation
+            and cached[1] is sports and len(cached[1]) == cached[3]
+        ):
+            return cached[2]
+
+        slot_name, _ = self._active_slot()
         patterns = SPORT_PRIORITY.get(slot_name, ["*"])
+        first_match = self._compiled_patterns(slot_name, patterns)
 
-        prioritized = {}
-        remaining = dict(sports)
+        # Un seul passage par sport, rangé sous son premier pattern correspondant
+        buckets: list[list[tuple[str, str]]] = [[] for _ in patterns]
+        for sport_key, display in sports.items():
+            index = first_match(sport_key)
+            if index is not None:
+                buckets[index].append((sport_key, display))
 
         # Uniquement les sports qui matchent les patterns du créneau actuel
         # (les sports hors-pattern sont ignorés pour économiser le quota API)
-        for pattern in patterns:
-            for sport_key, display in list(remaining.items()):
-                if fnmatch.fnmatch(sport_key, pattern):
-                    prioritized[sport_key] = display
-                    del remaining[sport_key]
-
+        prioritized = dict(chain.from_iterable(buckets))
+        if self._slot is not None:
+            self._prioritized_cache = (
+                self._slot_generation, sports, prioritized, len(sports)
+            )
         return prioritized
 
+    def _compiled_patterns(
+        self, slot_name: str, patterns: list[str]
+    ) -> Callable[[str], Optional[int]]:
+        """Matcher des patterns fnmatch d'un créneau, compilé une fois."""
+        matcher = self._pattern_cache.get(slot_name)
+        if matcher is None:
+            if hyperscan is not None and len(patterns) >= self.HYPERSCAN_MIN_PATTERNS:
+                matcher = _hyperscan_matcher(patterns)
+            if matcher is None:
+                matcher = _regex_matcher(patterns)
+            matcher = _memoized(matcher)
+            self._pattern_cache[slot_name] = matcher
+        return matcher
+
     # ── Matchs imminents (alerte composition) ────────────────
 
     def get_upcoming_matches(
@@ -159,38 +316,106 @@ class SmartScheduler:
         now = self.now
         threshold = now + timedelta(minutes=minutes)
         upcoming = []
+        self._evict_notified_matches(now, minutes)
+
+        if not events:
+            return upcoming
+
+        if len(events) < self.STRING_BOUNDS_MIN_EVENTS:
+            # Peu d'événements : parsing direct (mis en cache), sans bornes texte
+            for event in events:
+                commence_dt = self._parse_commence(event.get("commence_time"))
+                if commence_dt is not None and now <= commence_dt <= threshold:
+                    self._mark_upcoming(event, now, upcoming)
+            return upcoming
+
+        # Bornes au format fixe de l'API ("YYYY-MM-DDTHH:MM:SSZ") : à largeur
+        # fixe, l'ordre des chaînes est l'ordre chronologique, donc la plupart
+        # des événements sont filtrés sans être parsés. Borne basse arrondie à
+        # la seconde supérieure (l'API n'a pas de fractions de seconde).
+        low = now if not now.microsecond else now + timedelta(
+            microseconds=1_000_000 - now.microsecond
+        )
+        low_str = low.strftime(self._API_TIME_FORMAT)
+        high_str = threshold.strftime(self._API_TIME_FORMAT)
 
         for event in events:
             commence = event.get("commence_time")
-            if not commence:
-                continue
-
-            try:
-                # Parse ISO 8601 (The Odds API format)
-                if commence.endswith("Z"):
-                    commence_dt = datetime.fromisoformat(
-                        commence.replace("Z", "+00:00")
-                    )
-                    # Convertir en heure locale naïve pour comparer
-                    commence_dt = commence_dt.replace(tzinfo=None)
-                else:
-                    commence_dt = datetime.fromisoformat(commence)
-                    if commence_dt.tzinfo:
-                        commence_dt = commence_dt.replace(tzinfo=None)
-            except (ValueError, TypeError):
-                continue
+            if self._is_api_time(commence):
+                in_window = low_str <= commence <= high_str
+            else:
+                commence_dt = self._parse_commence(commence)
+                if commence_dt is None:
+                    continue
+                in_window = now <= commence_dt <= threshold
 
             # Match dans la fenêtre [maintenant, maintenant + N min]
-            if now <= commence_dt <= threshold:
-                event_id = event.get("id", "")
-                if event_id not in self._notified_matches:
-                    self._notified_matches.add(event_id)
-                    upcoming.append(event)
+            if in_window:
+                self._mark_upcoming(event, now, upcoming)
 
         return upcoming
 
+    def _mark_upcoming(self, event: dict, now: datetime, upcoming: list) -> None:
+        """Ajoute un match imminent s'il n'a pas déjà été notifié."""
+        event_id = event.get("id", "")
+        if event_id not in self._notified_matches:
+            self._notified_matches[event_id] = now
+            if len(self._notified_matches) > self.NOTIFIED_MATCHES_MAX:
+                self._notified_matches.popitem(last=False)
+            upcoming.append(event)
+
+    @staticmethod
+    def _is_api_time(commence) -> bool:
+        """Vrai pour le format fixe de l'API : "YYYY-MM-DDTHH:MM:SSZ"."""
+        return (
+            type(commence) is str and len(commence) == 20
+            and commence[-1] == "Z" and commence[10] == "T"
+        )
+
+    @classmethod
+    def _time_str(cls, commence) -> str:
+        """Heure "HH:MM" d'un commence_time ("?" si illisible)."""
+        if cls._is_api_time(commence):
+            # Format fixe : l'heure se lit directement, sans parsing
+            return commence[11:16]
+        dt = cls._parse_commence(commence)
+        return dt.strftime("%H:%M") if dt is not None else "?"
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_commence(commence: Optional[str]) -> Optional[datetime]:
+        """
+        Parse un commence_time ISO 8601 en datetime naïf (None si invalide).
+
+        Mis en cache par chaîne : les mêmes horaires reviennent à chaque scan
+        et sont partagés par de nombreux événements.
+        """
+        if not commence:
+            return None
+        try:
+            # Format The Odds API "...Z" : retirer le Z donne directement l'heure naïve
+            if commence.endswith("Z"):
+                return datetime.fromisoformat(commence[:-1])
+            dt = datetime.fromisoformat(commence)
+            return dt.replace(tzinfo=None) if dt.tzinfo else dt
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def _evict_notified_matches(self, now: datetime, minutes: int):
+        """
+        Oublie les matchs notifiés il y a plus de 2 × la fenêtre d'alerte :
+        ils ont commencé et ne peuvent plus être imminents.
+        """
+        expiry = now - timedelta(minutes=2 * max(minutes, LINEUP_ALERT_MINUTES))
+        notified = self._notified_matches
+        while notified:
+            oldest = next(iter(notified.values()))
+            if oldest >= expiry:
+                break
+            notified.popitem(last=False)
+
     def clear_notified_matches(self):
-        """Réinitialise le cache des matchs notifiés (à appeler périodiquement)."""
+        """Réinitialise le cache des matchs notifiés (l'expiration est automatique)."""
         self._notified_matches.clear()
 
     # ── Messages de status ───────────────────────────────────
@@ -241,39 +466,28 @@ class SmartScheduler:
         if not events:
             return ""
 
-        lines = [f"📋 <b>Matchs dans moins de {LINEUP_ALERT_MINUTES} min</b>\n"]
-
-        for event in events[:10]:  # Max 10 pour éviter les messages trop longs
-            home = event.get("home_team", "?")
-            away = event.get("away_team", "?")
-            commence = event.get("commence_time", "")
-
-            try:
-                if commence.endswith("Z"):
-                    dt = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                    dt = dt.replace(tzinfo=None)
-                else:
-                    dt = datetime.fromisoformat(commence)
-                    if dt.tzinfo:
-                        dt = dt.replace(tzinfo=None)
-                time_str = dt.strftime("%H:%M")
-            except (ValueError, TypeError):
-                time_str = "?"
-
-            lines.append(f"⚽ {home} vs {away} — {time_str}")
-
-        lines.append(
+        header = f"📋 <b>Matchs dans moins de {LINEUP_ALERT_MINUTES} min</b>\n"
+        footer = (
             f"\n💡 <i>Surveillez les compositions ! "
             f"Décalage de cotes possible.</i>"
         )
 
-        return "\n".join(lines)
+        # Message assemblé en un seul join ; max 10 matchs pour rester court
+        return "\n".join(chain(
+            (header,),
+            (
+                f"⚽ {event.get('home_team', '?')} vs {event.get('away_team', '?')}"
+                f" — {self._time_str(event.get('commence_time'))}"
+                for event in events[:10]
+            ),
+            (footer,),
+        ))
 
     # ── Stats ────────────────────────────────────────────────
 
     def get_stats(self) -> dict:
         """Retourne les stats du scheduler pour le status du bot."""
-        slot_name, slot = self.get_current_slot()
+        slot_name, slot = self._active_slot()
         return {
             "current_slot": slot_name,
             "slot_label": slot["label"],
@@ -7,6 +7,8 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import asyncio
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Ajouter le dossier parent au path
@@ -15,35 +17,172 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from data.database import Database
 from config import DB_FILE
 
+# Fuseau local du serveur (les dates sont stockées en timestamps unix)
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
 
 @st.cache_resource
 def get_database():
-    """Crée et retourne une connexion DB mise en cache."""
+    """Connexion DB ouverte une fois pour tout le process du dashboard.
+    
+    La connexion aiosqlite reste attachée à une boucle asyncio dédiée,
+    conservée avec elle ; le verrou sérialise les reruns concurrents
+    (une boucle ne peut pas tourner dans deux threads à la fois).
+    """
+    loop = asyncio.new_event_loop()
     db = Database(DB_FILE)
-    return db
+    loop.run_until_complete(db.connect())
+    # Les threads aiosqlite ne sont pas daemon : les fermer quand le process s'arrête
+    threading.Thread(target=_stop_db_at_exit, args=(db,), daemon=True).start()
+    return loop, db, threading.Lock()
+
+
+def _stop_db_at_exit(db: Database):
+    """Attend la fin du thread principal puis ferme la connexion DB."""
+    threading.main_thread().join()
+    db.stop()
 
 @st.cache_data(ttl=30)  # Cache de 30 secondes
 def load_data_cached():
-    """Charge les données avec cache pour améliorer les performances."""
+    """Charge les données avec cache pour améliorer les performances.
+    
+    `loaded_at` identifie l'instantané : les vues le reçoivent comme clé de
+    cache et sont toutes construites à partir des mêmes données.
+    """
+    loop, db, lock = get_database()
+    
     async def _load():
-        db = get_database()
-        await db.connect()
-        try:
-            surebets = await db.get_surebets(limit=500)
-            stats = await db.get_stats()
-            logs = await db.get_logs(limit=200)
-            api_usage = await db.get_api_usage(limit=100)
-            return {
-                "surebets": surebets,
-                "stats": stats,
-                "logs": logs,
-                "api_usage": api_usage
-            }
-        finally:
-            await db.close()
+        # Requêtes indépendantes : lancées ensemble, chacune sur une
+        # connexion du pool de lecteurs de Database
+        surebets, stats, logs, api_usage = await asyncio.gather(
+            db.get_surebets(limit=500),
+            db.get_stats(),
+            db.get_logs(limit=200),
+            db.get_api_usage(limit=100)
+        )
+        return {
+            "surebets": surebets,
+            "stats": stats,
+            "logs": logs,
+            "api_usage": api_usage,
+            "loaded_at": time.time()
+        }
+    
+    # Connexion persistante : seules les requêtes sont payées à chaque rafraîchissement
+    with lock:
+        return loop.run_until_complete(_load())
+
+
+def to_local_datetime(timestamps: pd.Series) -> pd.Series:
+    """Timestamps unix (stockés en base) -> dates locales naïves pour l'affichage."""
+    return (
+        pd.to_datetime(timestamps, unit="s", utc=True)
+        .dt.tz_convert(LOCAL_TZ)
+        .dt.tz_localize(None)
+    )
+
+
+# Colonnes de l'onglet Surebets : nom en base -> libellé affiché
+SUREBET_COLUMNS = {
+    "detected_at": "Date",
+    "sport": "Sport",
+    "league": "Ligue",
+    "match": "Match",
+    "market": "Marché",
+    "bookmaker1": "Bookmaker 1",
+    "odds1": "Cote 1",
+    "bookmaker2": "Bookmaker 2",
+    "odds2": "Cote 2",
+    "profit_pct": "Profit %",
+    "profit_base_100": "Gain/100€"
+}
+
+
+@st.cache_data(max_entries=1)
+def build_surebet_frame(loaded_at: float, _surebets: list):
+    """Tableau des surebets prêt à afficher, construit une fois par instantané.
     
-    # Utiliser asyncio.run() au lieu de créer une nouvelle boucle
-    return asyncio.run(_load())
+    Le sport est catégoriel : le filtre par sport compare des codes entiers.
+    """
+    df = pd.DataFrame(_surebets, columns=list(SUREBET_COLUMNS))
+    df = df.rename(columns=SUREBET_COLUMNS)
+    df["Date"] = to_local_datetime(df["Date"])
+    df["Sport"] = df["Sport"].astype("category")
+    return df
+
+
+# Figures Plotly construites une fois par instantané de load_data_cached
+# (pas à chaque rerun) ; None si pas de données.
+# Clé de cache = `loaded_at` seul : les paramètres préfixés par _ ne sont pas
+# hachés par Streamlit, et une entrée suffit (nouvel instantané = nouvelle clé).
+
+@st.cache_data(max_entries=1)
+def build_sport_pie(loaded_at: float, _by_sport: list):
+    """Camembert du volume de surebets par sport."""
+    if not _by_sport:
+        return None
+    return px.pie(
+        pd.DataFrame(_by_sport),
+        values="count",
+        names="sport",
+        title="Volume par Sport"
+    )
+
+@st.cache_data(max_entries=1)
+def build_market_bar(loaded_at: float, _by_market: list):
+    """Profit moyen par marché."""
+    if not _by_market:
+        return None
+    return px.bar(
+        pd.DataFrame(_by_market),
+        x="market",
+        y="avg_profit",
+        title="Profit Moyen par Marché (%)"
+    )
+
+@st.cache_data(max_entries=1)
+def build_daily_figure(loaded_at: float, _surebets: list):
+    """Volume et profit quotidiens des surebets."""
+    if not _surebets:
+        return None
+    
+    df = pd.DataFrame(_surebets)
+    # Index datetime64 + resample : pas de colonne d'objets date Python
+    df = df.set_index(to_local_datetime(df["detected_at"]))
+    
+    daily = df.resample("D").agg(
+        Nombre=("id", "count"),
+        Profit_Total=("profit_pct", "sum")
+    ).reset_index()
+    daily.columns = ["Date", "Nombre", "Profit Total"]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=daily["Date"], y=daily["Nombre"], name="Surebets"))
+    fig.add_trace(go.Scatter(x=daily["Date"], y=daily["Profit Total"], name="Profit %", yaxis="y2"))
+    
+    fig.update_layout(
+        title="Volume et Profit Quotidiens",
+        yaxis=dict(title="Nombre de Surebets"),
+        yaxis2=dict(title="Profit Total %", overlaying="y", side="right")
+    )
+    return fig
+
+@st.cache_data(max_entries=1)
+def build_api_usage(loaded_at: float, _api_usage: list):
+    """Courbe du quota API et tableau d'usage associé."""
+    if not _api_usage:
+        return None, None
+    
+    df = pd.DataFrame(_api_usage)
+    df["timestamp"] = to_local_datetime(df["timestamp"])
+    
+    fig = px.line(
+        df,
+        x="timestamp",
+        y="requests_remaining",
+        title="Évolution du Quota API"
+    )
+    return fig, df[["timestamp", "api_key", "requests_used", "requests_remaining"]]
 
 
 def main():
@@ -64,7 +203,8 @@ def main():
         st.error(f"Erreur chargement données: {e}")
         import traceback
         st.exception(e)
-        data = {"surebets": [], "stats": {}, "logs": [], "api_usage": []}
+        data = {"surebets": [], "stats": {}, "logs": [], "api_usage": [], "loaded_at": 0.0}
+    loaded_at = data["loaded_at"]
     
     # === MÉTRIQUES PRINCIPALES ===
     col1, col2, col3, col4 = st.columns(4)
@@ -114,42 +254,27 @@ def main():
         surebets = data.get("surebets", [])
         
         if surebets:
-            df = pd.DataFrame(surebets)
+            # Tableau construit et renommé une fois (cache), pas à chaque rerun
+            df = build_surebet_frame(loaded_at, surebets)
             
             # Filtres
             col1, col2 = st.columns(2)
             with col1:
                 sport_filter = st.selectbox(
                     "Filtrer par sport",
-                    ["Tous"] + list(df["sport"].unique())
+                    ["Tous"] + list(df["Sport"].cat.categories)
                 )
             with col2:
                 min_profit = st.slider("Profit minimum (%)", 0.0, 10.0, 0.0, 0.1)
             
             # Appliquer filtres
             if sport_filter != "Tous":
-                df = df[df["sport"] == sport_filter]
-            df = df[df["profit_pct"] >= min_profit]
+                df = df[df["Sport"] == sport_filter]
+            df = df[df["Profit %"] >= min_profit]
             
             # Afficher
             st.dataframe(
-                df[[
-                    "detected_at", "sport", "league", "match", "market",
-                    "bookmaker1", "odds1", "bookmaker2", "odds2",
-                    "profit_pct", "profit_base_100"
-                ]].rename(columns={
-                    "detected_at": "Date",
-                    "sport": "Sport",
-                    "league": "Ligue",
-                    "match": "Match",
-                    "market": "Marché",
-                    "bookmaker1": "Bookmaker 1",
-                    "odds1": "Cote 1",
-                    "bookmaker2": "Bookmaker 2",
-                    "odds2": "Cote 2",
-                    "profit_pct": "Profit %",
-                    "profit_base_100": "Gain/100€"
-                }),
+                df,
                 use_container_width=True,
                 hide_index=True
             )
@@ -165,15 +290,8 @@ def main():
         # Par sport
         with col1:
             st.markdown("### 📊 Répartition par Sport")
-            by_sport = stats.get("by_sport", [])
-            if by_sport:
-                df_sport = pd.DataFrame(by_sport)
-                fig = px.pie(
-                    df_sport, 
-                    values="count", 
-                    names="sport",
-                    title="Volume par Sport"
-                )
+            fig = build_sport_pie(loaded_at, stats.get("by_sport", []))
+            if fig is not None:
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Pas de données")
@@ -181,64 +299,28 @@ def main():
         # Par marché
         with col2:
             st.markdown("### 📈 Top Marchés")
-            by_market = stats.get("by_market", [])
-            if by_market:
-                df_market = pd.DataFrame(by_market)
-                fig = px.bar(
-                    df_market,
-                    x="market",
-                    y="avg_profit",
-                    title="Profit Moyen par Marché (%)"
-                )
+            fig = build_market_bar(loaded_at, stats.get("by_market", []))
+            if fig is not None:
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Pas de données")
         
         # Tendances temporelles
         st.markdown("### 📅 Tendances Temporelles")
-        surebets = data.get("surebets", [])
-        if surebets:
-            df = pd.DataFrame(surebets)
-            df["detected_at"] = pd.to_datetime(df["detected_at"])
-            df["date"] = df["detected_at"].dt.date
-            
-            daily = df.groupby("date").agg({
-                "id": "count",
-                "profit_pct": "sum"
-            }).reset_index()
-            daily.columns = ["Date", "Nombre", "Profit Total"]
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(x=daily["Date"], y=daily["Nombre"], name="Surebets"))
-            fig.add_trace(go.Scatter(x=daily["Date"], y=daily["Profit Total"], name="Profit %", yaxis="y2"))
-            
-            fig.update_layout(
-                title="Volume et Profit Quotidiens",
-                yaxis=dict(title="Nombre de Surebets"),
-                yaxis2=dict(title="Profit Total %", overlaying="y", side="right")
-            )
-            
+        fig = build_daily_figure(loaded_at, data.get("surebets", []))
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
     
     # === TAB 3: USAGE API ===
     with tab3:
         st.subheader("Consommation API")
         
-        api_usage = data.get("api_usage", [])
-        if api_usage:
-            df = pd.DataFrame(api_usage)
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-            
-            fig = px.line(
-                df,
-                x="timestamp",
-                y="requests_remaining",
-                title="Évolution du Quota API"
-            )
+        fig, df = build_api_usage(loaded_at, data.get("api_usage", []))
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
             
             st.dataframe(
-                df[["timestamp", "api_key", "requests_used", "requests_remaining"]],
+                df,
                 use_container_width=True,
                 hide_index=True
             )
@@ -259,6 +341,7 @@ def main():
         logs = data.get("logs", [])
         if logs:
             df = pd.DataFrame(logs)
+            df["timestamp"] = to_local_datetime(df["timestamp"])
             
             if level_filter != "Tous":
                 df = df[df["level"] == level_filter]
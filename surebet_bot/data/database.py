@@ -1,10 +1,198 @@
 # Base de données SQLite pour l'historique
 
+import asyncio
+import time
 import aiosqlite
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Optional
-from dataclasses import dataclass
+from typing import Callable, Optional, Union
+from dataclasses import dataclass, field
+
+
+# Requêtes SQL figées (chaînes identiques à chaque appel : le cache de
+# statements préparés de sqlite3 les compile une seule fois)
+
+_SQL_INSERT_SUREBET = """
+    INSERT INTO surebets 
+    (detected_at, sport, league, match, market, bookmaker1, odds1, 
+     bookmaker2, odds2, profit_pct, profit_base_100, notified)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_API_USAGE = """
+    INSERT INTO api_usage (timestamp, api_key, requests_used, requests_remaining)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_LOG = """
+    INSERT INTO logs (timestamp, level, message) VALUES (?, ?, ?)
+"""
+
+# INSERT multi-VALUES : lignes par requête sous la limite historique de
+# 999 variables SQLite (8 paramètres par cote brute, 12 par surebet)
+_SQL_INSERT_RAW_ODDS_HEAD = (
+    "INSERT INTO raw_odds (timestamp, sport_id, match_id, market_id, bookmaker_id, outcome_id,"
+    " odds, implied_prob)"
+)
+_RAW_ODDS_ROWS_PER_INSERT = 100
+# Noms de dimension relus par SELECT ... IN (...) (sous la limite de variables)
+_DIMENSION_NAMES_PER_SELECT = 500
+
+_SQL_INSERT_SUREBETS_HEAD = (
+    "INSERT INTO surebets (detected_at, sport, league, match, market, bookmaker1, odds1,"
+    " bookmaker2, odds2, profit_pct, profit_base_100, notified)"
+)
+_SUREBETS_ROWS_PER_INSERT = 80
+
+
+@lru_cache(maxsize=None)
+def _sql_multi_values(head: str, columns: int, rows: int) -> str:
+    """INSERT multi-VALUES de `rows` lignes (construit une fois par taille)."""
+    row = "(" + ", ".join(["?"] * columns) + ")"
+    return head + " VALUES " + ",".join([row] * rows)
+
+_SQL_INSERT_VALUE_BET = """
+    INSERT INTO value_bets
+    (detected_at, sport, league, match, market, outcome, bookmaker,
+     odds, consensus_prob, value_pct, bookmakers_count, notified)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_SCAN = """
+    INSERT INTO scans (timestamp, sports_scanned, events_found, surebets_found, api_key, requests_remaining)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# PRAGMAs propres à chaque connexion (écrivain et lecteurs)
+_SQL_CONNECTION_PRAGMAS = """
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+"""
+
+# Cotes brutes : les noms (très répétés) sont stockés une fois dans des tables
+# de dimension et référencés par ID entier dans raw_odds
+_RAW_ODDS_DIMENSIONS = ("sport", "match", "market", "bookmaker", "outcome")
+
+_SQL_CREATE_RAW_ODDS = "".join(
+    f"CREATE TABLE IF NOT EXISTS dim_{dim} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);\n"
+    for dim in _RAW_ODDS_DIMENSIONS
+) + """
+    CREATE TABLE IF NOT EXISTS raw_odds (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER NOT NULL,  -- timestamp unix
+        sport_id INTEGER NOT NULL,
+        match_id INTEGER NOT NULL,
+        market_id INTEGER NOT NULL,
+        bookmaker_id INTEGER NOT NULL,
+        outcome_id INTEGER NOT NULL,
+        odds REAL NOT NULL,
+        implied_prob REAL
+    );
+"""
+
+_SQL_SELECT_RAW_ODDS = """
+    SELECT r.id, r.timestamp, s.name AS sport, m.name AS match, k.name AS market,
+           b.name AS bookmaker, o.name AS outcome, r.odds, r.implied_prob
+    FROM raw_odds r
+    JOIN dim_sport s ON s.id = r.sport_id
+    JOIN dim_match m ON m.id = r.match_id
+    JOIN dim_market k ON k.id = r.market_id
+    JOIN dim_bookmaker b ON b.id = r.bookmaker_id
+    JOIN dim_outcome o ON o.id = r.outcome_id
+"""
+
+# Statistiques en un seul aller-retour et un seul parcours de surebets :
+# agrégat (sport, marché) matérialisé, puis lignes étiquetées par k
+# (0 = totaux, 1 = par sport, 2 = top 10 des marchés)
+_SQL_STATS = """
+    WITH g AS MATERIALIZED (
+        SELECT sport, market, COUNT(*) AS n, SUM(profit_pct) AS p
+        FROM surebets GROUP BY sport, market
+    )
+    SELECT 0 AS k, NULL AS name, SUM(n) AS n, SUM(p) AS v FROM g
+    UNION ALL
+    SELECT * FROM (SELECT 1, sport, SUM(n), SUM(p) FROM g GROUP BY sport)
+    UNION ALL
+    SELECT * FROM (
+        SELECT 2, market, SUM(n) AS n, SUM(p) / SUM(n) FROM g
+        GROUP BY market ORDER BY n DESC LIMIT 10
+    )
+    ORDER BY k, n DESC
+"""
+
+_SQL_GET_SUREBETS_ALL = "SELECT * FROM surebets ORDER BY detected_at DESC LIMIT ?"
+_SQL_GET_SUREBETS_BY_SPORT = "SELECT * FROM surebets WHERE sport = ? ORDER BY detected_at DESC LIMIT ?"
+
+# Tables en ajout seul, un seul écrivain : l'ordre des id (clé primaire) est
+# l'ordre chronologique, sans index ni tri sur timestamp
+_SQL_GET_LOGS_ALL = "SELECT * FROM logs ORDER BY id DESC LIMIT ?"
+_SQL_GET_LOGS_BY_LEVEL = "SELECT * FROM logs WHERE level = ? ORDER BY id DESC LIMIT ?"
+
+_SQL_GET_RAW_ODDS_ALL = _SQL_SELECT_RAW_ODDS + "ORDER BY r.id DESC LIMIT ?"
+_SQL_GET_RAW_ODDS_BY_SPORT = _SQL_SELECT_RAW_ODDS + "WHERE s.name = ? ORDER BY r.id DESC LIMIT ?"
+
+_SQL_GET_VALUE_BETS_ALL = "SELECT * FROM value_bets ORDER BY detected_at DESC LIMIT ?"
+_SQL_GET_VALUE_BETS_BY_SPORT = "SELECT * FROM value_bets WHERE sport = ? ORDER BY detected_at DESC LIMIT ?"
+
+_SQL_GET_API_USAGE = "SELECT * FROM api_usage ORDER BY id DESC LIMIT ?"
+
+_SQL_GET_SCANS = "SELECT * FROM scans ORDER BY id DESC LIMIT ?"
+
+# Anciennes bases : dates TEXT ("YYYY-MM-DD HH:MM:SS[.ffffff]") converties en
+# timestamps unix. detected_at était l'heure locale (adaptateur datetime de
+# sqlite3), les colonnes timestamp l'heure UTC (CURRENT_TIMESTAMP).
+_SQL_MIGRATE_V1 = """
+    UPDATE surebets SET detected_at = CAST(strftime('%s', detected_at, 'utc') AS INTEGER)
+        WHERE typeof(detected_at) = 'text';
+    UPDATE value_bets SET detected_at = CAST(strftime('%s', detected_at, 'utc') AS INTEGER)
+        WHERE typeof(detected_at) = 'text';
+    UPDATE api_usage SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+        WHERE typeof(timestamp) = 'text';
+    UPDATE logs SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+        WHERE typeof(timestamp) = 'text';
+    UPDATE raw_odds SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+        WHERE typeof(timestamp) = 'text';
+    UPDATE scans SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+        WHERE typeof(timestamp) = 'text';
+    
+    -- Préfixe de l'index composé (sport, date)
+    DROP INDEX IF EXISTS idx_surebets_sport;
+"""
+
+# raw_odds en colonnes TEXT -> IDs vers les tables de dimension (les index de
+# l'ancienne table disparaissent avec elle, recréés par _create_tables)
+_SQL_MIGRATE_V2 = (
+    "ALTER TABLE raw_odds RENAME TO raw_odds_v1;\n"
+    + _SQL_CREATE_RAW_ODDS
+    + "".join(
+        f"INSERT OR IGNORE INTO dim_{dim} (name) SELECT DISTINCT {dim} FROM raw_odds_v1;\n"
+        for dim in _RAW_ODDS_DIMENSIONS
+    )
+    + """
+    INSERT INTO raw_odds (id, timestamp, sport_id, match_id, market_id, bookmaker_id,
+                          outcome_id, odds, implied_prob)
+    SELECT r.id, r.timestamp, s.id, m.id, k.id, b.id, o.id, r.odds, r.implied_prob
+    FROM raw_odds_v1 r
+    JOIN dim_sport s ON s.name = r.sport
+    JOIN dim_match m ON m.name = r.match
+    JOIN dim_market k ON k.name = r.market
+    JOIN dim_bookmaker b ON b.name = r.bookmaker
+    JOIN dim_outcome o ON o.name = r.outcome;
+    DROP TABLE raw_odds_v1;
+"""
+)
+
+# Lectures triées par id : l'index sur timestamp des cotes brutes n'est plus
+# que du coût à l'insertion ; logs filtrés par level via idx_logs_level (level, id)
+_SQL_MIGRATE_V3 = """
+    DROP INDEX IF EXISTS idx_raw_odds_timestamp;
+    DROP INDEX IF EXISTS idx_logs_level_ts;
+"""
 
 
 @dataclass
@@ -43,30 +231,275 @@ class SurebetRecord:
     notified: bool = True
 
 
+@dataclass(slots=True)
+class RawOddsBatch:
+    """Lot de cotes brutes en colonnes (une liste par champ, même longueur)."""
+    sport: list[str] = field(default_factory=list)
+    match: list[str] = field(default_factory=list)
+    market: list[str] = field(default_factory=list)
+    bookmaker: list[str] = field(default_factory=list)
+    outcome: list[str] = field(default_factory=list)
+    odds: list[float] = field(default_factory=list)
+    
+    def append(self, sport: str, match: str, market: str,
+               bookmaker: str, outcome: str, odds: float):
+        """Ajoute une cote au lot."""
+        self.sport.append(sport)
+        self.match.append(match)
+        self.market.append(market)
+        self.bookmaker.append(bookmaker)
+        self.outcome.append(outcome)
+        self.odds.append(odds)
+    
+    def __len__(self) -> int:
+        return len(self.odds)
+    
+    def clear(self):
+        """Vide le lot (réutilisable après une écriture)."""
+        for column in (self.sport, self.match, self.market,
+                       self.bookmaker, self.outcome, self.odds):
+            column.clear()
+    
+    def rows(self):
+        """Itère les lignes (sport, match, market, bookmaker, outcome, odds)."""
+        return zip(self.sport, self.match, self.market,
+                   self.bookmaker, self.outcome, self.odds)
+
+
 class Database:
     """Gestionnaire de base de données SQLite asynchrone."""
     
-    def __init__(self, db_path: Path):
+    # Taille du cache de statements préparés de sqlite3 (défaut Python : 128)
+    CACHED_STATEMENTS = 256
+    # Version du schéma (PRAGMA user_version) : 1 = dates en timestamps unix
+    # entiers, 2 = cotes brutes normalisées (tables de dimension), 3 = lectures
+    # triées par id (index sur timestamp supprimés)
+    SCHEMA_VERSION = 3
+    # Connexions en lecture seule (get_*), distinctes de la connexion d'écriture
+    READ_POOL_SIZE = 4
+    # Nombre max d'écritures regroupées dans une même transaction
+    MAX_WRITE_BATCH = 256
+    # Tampon de save_raw_odds : écrit à partir de N lignes ou après N secondes
+    RAW_ODDS_BUFFER_ROWS = 500
+    RAW_ODDS_BUFFER_SECONDS = 1.0
+    
+    def __init__(self, db_path: Path, wal: bool = True):
+        """
+        Args:
+            db_path: Chemin du fichier SQLite
+            wal: Journal WAL (désactiver sur un système de fichiers réseau)
+        """
         self.db_path = db_path
+        self.wal = wal
+        # Connexion d'écriture (utilisée uniquement par le writer et le schéma)
         self._conn: Optional[aiosqlite.Connection] = None
+        # Pool de lecteurs : en WAL, les lectures n'attendent pas les commits
+        self._readers: Optional[asyncio.Queue] = None
+        self._reader_conns: list[aiosqlite.Connection] = []
+        # File d'écritures vidée par une seule tâche (un commit par lot)
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        # Cotes brutes unitaires en attente (timestamp, sport, ..., odds, implied_prob)
+        self._raw_odds_buffer: list[tuple] = []
+        self._raw_odds_buffer_since = 0.0
+        # Cache nom -> ID des tables de dimension (seul ce process écrit les IDs)
+        # nom -> ID commité, par dimension (les IDs sont résolus dans la transaction d'écriture)
+        self._dimension_ids: dict[str, dict[str, int]] = {}
     
     async def connect(self):
-        """Ouvre la connexion et crée les tables."""
-        self._conn = await aiosqlite.connect(self.db_path)
-        await self._create_tables()
+        """Ouvre les connexions, règle les PRAGMAs et crée les tables."""
+        self._conn = await aiosqlite.connect(
+            self.db_path, cached_statements=self.CACHED_STATEMENTS
+        )
+        await self._configure()
+        # Schéma à jour : ni CREATE à re-planifier ni commit au démarrage
+        cursor = await self._conn.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+        if version < self.SCHEMA_VERSION:
+            await self._migrate(version)
+            await self._create_tables()
+        await self._load_dimensions(self._conn)
+        
+        self._reader_conns = list(await asyncio.gather(
+            *(self._open_reader() for _ in range(self.READ_POOL_SIZE))
+        ))
+        self._readers = asyncio.Queue()
+        for reader in self._reader_conns:
+            self._readers.put_nowait(reader)
+        
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+    
+    async def _configure(self):
+        """PRAGMAs de performance (WAL : un seul fsync par commit, lecteurs non bloquants)."""
+        if self.wal:
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            # Sûr en WAL : seul un crash OS peut perdre les derniers commits
+            await self._conn.execute("PRAGMA synchronous=NORMAL")
+        else:
+            # Le mode WAL est persistant dans le fichier : revenir explicitement au journal classique
+            await self._conn.execute("PRAGMA journal_mode=DELETE")
+        await self._conn.executescript(_SQL_CONNECTION_PRAGMAS)
+        await self._conn.commit()
+    
+    async def _open_reader(self) -> aiosqlite.Connection:
+        """Ouvre une connexion en lecture seule."""
+        reader = await aiosqlite.connect(
+            self.db_path, cached_statements=self.CACHED_STATEMENTS
+        )
+        await reader.executescript(_SQL_CONNECTION_PRAGMAS + "PRAGMA query_only=1;")
+        return reader
+    
+    @asynccontextmanager
+    async def _reader(self):
+        """Emprunte une connexion du pool de lecteurs."""
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
+    
+    async def _fetch_dicts(self, query: str, params=()) -> list[dict]:
+        """Exécute une lecture sur un lecteur du pool, lignes en dicts."""
+        async with self._reader() as reader:
+            cursor = await reader.execute(query, params)
+            rows = await cursor.fetchall()
+        columns = [d[0] for d in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
     
     async def close(self):
-        """Ferme la connexion."""
+        """Commite les écritures en attente puis ferme la connexion."""
+        if self._writer_task is not None:
+            await self._flush_raw_odds_buffer()
+            # Sentinelle en fin de file : le writer termine tout ce qui précède
+            self._write_queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+        for reader in self._reader_conns:
+            await reader.close()
+        self._reader_conns = []
         if self._conn:
             await self._conn.close()
     
+    def stop(self):
+        """Ferme les connexions sans boucle asyncio (appelable depuis un autre thread)."""
+        for reader in self._reader_conns:
+            reader.stop()
+        if self._conn:
+            self._conn.stop()
+    
+    async def flush(self):
+        """Attend que toutes les écritures en file (et le tampon de cotes) soient commitées."""
+        if self._write_queue is not None:
+            await self._flush_raw_odds_buffer()
+            await self._write_queue.join()
+    
+    # === ÉCRITURES GROUPÉES ===
+    
+    async def _write(self, sql: Union[str, Callable], params, many: bool = False,
+                     need_id: bool = False):
+        """Met une écriture en file et attend son commit.
+        
+        sql peut être une coroutine `async (conn) -> résultat`, exécutée dans
+        la transaction du writer (params ignoré) : son résultat est renvoyé.
+        
+        Returns:
+            lastrowid si need_id, résultat de la coroutine, sinon None
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((sql, params, many, need_id, future))
+        return await future
+    
+    async def _writer(self):
+        """Vide la file : toutes les écritures en attente partagent un commit."""
+        queue = self._write_queue
+        while True:
+            item = await queue.get()
+            # Laisser les écrivains concurrents déposer leurs écritures
+            await asyncio.sleep(0)
+            batch = [item]
+            while item is not None and len(batch) < self.MAX_WRITE_BATCH and not queue.empty():
+                item = queue.get_nowait()
+                batch.append(item)
+            
+            writes = [w for w in batch if w is not None]
+            if writes:
+                try:
+                    await self._commit_batch(writes)
+                except Exception as e:
+                    # Le writer ne doit jamais mourir : sinon _write()/flush() attendent à vie
+                    self._fail_writes(writes, e)
+            for _ in batch:
+                queue.task_done()
+            if batch[-1] is None:
+                return
+    
+    @staticmethod
+    def _fail_writes(writes: list[tuple], error: Exception):
+        """Propage une erreur aux écritures du lot encore en attente."""
+        for *_, future in writes:
+            if not future.done():
+                future.set_exception(error)
+    
+    async def _commit_batch(self, writes: list[tuple]):
+        """Exécute un lot d'écritures dans une seule transaction.
+        
+        Si le lot échoue, il est annulé puis rejoué écriture par écriture :
+        seule l'écriture fautive reçoit l'exception, les autres sont commitées.
+        """
+        results = []
+        try:
+            await self._conn.execute("BEGIN IMMEDIATE")
+            i = 0
+            while i < len(writes):
+                sql, params, many, need_id, _ = writes[i]
+                if callable(sql):
+                    results.append(await sql(self._conn))
+                    i += 1
+                    continue
+                if many or need_id:
+                    if many:
+                        cursor = await self._conn.executemany(sql, params)
+                    else:
+                        cursor = await self._conn.execute(sql, params)
+                    results.append(cursor.lastrowid if need_id else None)
+                    i += 1
+                    continue
+                
+                # Écritures simples consécutives sur la même requête : un executemany
+                j = i + 1
+                while (j < len(writes) and writes[j][0] == sql
+                       and not writes[j][2] and not writes[j][3]):
+                    j += 1
+                await self._conn.executemany(sql, [w[1] for w in writes[i:j]])
+                results.extend([None] * (j - i))
+                i = j
+            await self._conn.commit()
+        except Exception as e:
+            try:
+                await self._conn.rollback()
+            except Exception:
+                # Connexion inutilisable : rejouer échouerait aussi
+                self._fail_writes(writes, e)
+                return
+            if len(writes) == 1:
+                self._fail_writes(writes, e)
+                return
+            for write in writes:
+                await self._commit_batch([write])
+            return
+        
+        for (*_, future), result in zip(writes, results):
+            if not future.done():
+                future.set_result(result)
+    
     async def _create_tables(self):
-        """Crée les tables si elles n'existent pas."""
-        await self._conn.executescript("""
+        """Crée les tables (schéma courant) si elles n'existent pas."""
+        await self._conn.executescript(_SQL_CREATE_RAW_ODDS + """
             -- Table des surebets détectés
             CREATE TABLE IF NOT EXISTS surebets (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                detected_at INTEGER NOT NULL,  -- timestamp unix
                 sport TEXT NOT NULL,
                 league TEXT NOT NULL,
                 match TEXT NOT NULL,
@@ -83,7 +516,7 @@ class Database:
             -- Table d'usage API
             CREATE TABLE IF NOT EXISTS api_usage (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER NOT NULL,  -- timestamp unix
                 api_key TEXT NOT NULL,
                 requests_used INTEGER,
                 requests_remaining INTEGER
@@ -92,28 +525,15 @@ class Database:
             -- Table des logs (pour le dashboard)
             CREATE TABLE IF NOT EXISTS logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER NOT NULL,  -- timestamp unix
                 level TEXT NOT NULL,
                 message TEXT NOT NULL
             );
             
-            -- Table des cotes brutes (pour analyse)
-            CREATE TABLE IF NOT EXISTS raw_odds (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                sport TEXT NOT NULL,
-                match TEXT NOT NULL,
-                market TEXT NOT NULL,
-                bookmaker TEXT NOT NULL,
-                outcome TEXT NOT NULL,
-                odds REAL NOT NULL,
-                implied_prob REAL
-            );
-            
             -- Table des scans (pour statistiques)
             CREATE TABLE IF NOT EXISTS scans (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER NOT NULL,  -- timestamp unix
                 sports_scanned INTEGER,
                 events_found INTEGER,
                 surebets_found INTEGER,
@@ -124,7 +544,7 @@ class Database:
             -- Table des value bets détectés
             CREATE TABLE IF NOT EXISTS value_bets (
                 id               INTEGER PRIMARY KEY AUTOINCREMENT,
-                detected_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                detected_at      INTEGER NOT NULL,  -- timestamp unix
                 sport            TEXT NOT NULL,
                 league           TEXT NOT NULL,
                 match            TEXT NOT NULL,
@@ -140,74 +560,111 @@ class Database:
 
             -- Index pour les requêtes fréquentes
             CREATE INDEX IF NOT EXISTS idx_surebets_date ON surebets(detected_at);
-            CREATE INDEX IF NOT EXISTS idx_surebets_sport ON surebets(sport);
+            CREATE INDEX IF NOT EXISTS idx_surebets_sport_date ON surebets(sport, detected_at DESC);
             CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level);
-            CREATE INDEX IF NOT EXISTS idx_raw_odds_match ON raw_odds(match);
-            CREATE INDEX IF NOT EXISTS idx_raw_odds_timestamp ON raw_odds(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_raw_odds_match ON raw_odds(match_id);
             CREATE INDEX IF NOT EXISTS idx_value_bets_date  ON value_bets(detected_at);
             CREATE INDEX IF NOT EXISTS idx_value_bets_match ON value_bets(match);
         """)
+        await self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        await self._conn.commit()
+    
+    async def _migrate(self, version: int):
+        """Met à jour une base existante de `version` vers SCHEMA_VERSION.
+        
+        Une base neuve n'a rien à migrer : _create_tables crée le schéma courant
+        et enregistre SCHEMA_VERSION dans PRAGMA user_version.
+        """
+        cursor = await self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'surebets'"
+        )
+        if await cursor.fetchone() is None:
+            return
+        
+        if version < 1:
+            await self._conn.executescript(_SQL_MIGRATE_V1)
+        if version < 2:
+            await self._conn.executescript(_SQL_MIGRATE_V2)
+        if version < 3:
+            await self._conn.executescript(_SQL_MIGRATE_V3)
         await self._conn.commit()
     
+    async def _load_dimensions(self, conn: aiosqlite.Connection):
+        """Charge les tables de dimension des cotes brutes en mémoire."""
+        for dim in _RAW_ODDS_DIMENSIONS:
+            cursor = await conn.execute(f"SELECT name, id FROM dim_{dim}")
+            self._dimension_ids[dim] = dict(await cursor.fetchall())
+    
     # === SUREBETS ===
     
     async def save_surebet(self, record: SurebetRecord) -> int:
         """Sauvegarde un surebet et retourne son ID."""
-        cursor = await self._conn.execute("""
-            INSERT INTO surebets 
-            (detected_at, sport, league, match, market, bookmaker1, odds1, 
-             bookmaker2, odds2, profit_pct, profit_base_100, notified)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            record.detected_at, record.sport, record.league, record.match,
+        return await self._write(_SQL_INSERT_SUREBET, (
+            int(record.detected_at.timestamp()), record.sport, record.league, record.match,
             record.market, record.bookmaker1, record.odds1,
             record.bookmaker2, record.odds2, record.profit_pct,
             record.profit_base_100, record.notified
+        ), need_id=True)
+    
+    async def save_surebets_many(self, records: list[SurebetRecord]) -> list[int]:
+        """Sauvegarde plusieurs surebets dans une même transaction.
+        
+        Returns:
+            IDs des surebets, dans l'ordre de records
+        """
+        if not records:
+            return []
+        
+        params = [
+            value
+            for r in records
+            for value in (
+                int(r.detected_at.timestamp()), r.sport, r.league, r.match,
+                r.market, r.bookmaker1, r.odds1,
+                r.bookmaker2, r.odds2, r.profit_pct,
+                r.profit_base_100, r.notified
+            )
+        ]
+        
+        # Un INSERT multi-VALUES par bloc ; blocs mis en file ensemble (même
+        # commit). Un seul écrivain : les IDs d'un INSERT sont consécutifs.
+        per_insert = _SUREBETS_ROWS_PER_INSERT
+        sizes = [min(per_insert, len(records) - i) for i in range(0, len(records), per_insert)]
+        last_ids = await asyncio.gather(*(
+            self._write(
+                _sql_multi_values(_SQL_INSERT_SUREBETS_HEAD, 12, size),
+                params[i * per_insert * 12:(i * per_insert + size) * 12],
+                need_id=True
+            )
+            for i, size in enumerate(sizes)
         ))
-        await self._conn.commit()
-        return cursor.lastrowid
+        return [
+            row_id
+            for size, last_id in zip(sizes, last_ids)
+            for row_id in range(last_id - size + 1, last_id + 1)
+        ]
     
     async def get_surebets(self, limit: int = 100, sport: str = None) -> list[dict]:
         """Récupère les derniers surebets."""
-        query = "SELECT * FROM surebets"
-        params = []
-        
         if sport:
-            query += " WHERE sport = ?"
-            params.append(sport)
-        
-        query += " ORDER BY detected_at DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor = await self._conn.execute(query, params)
-        rows = await cursor.fetchall()
-        columns = [d[0] for d in cursor.description]
-        
-        return [dict(zip(columns, row)) for row in rows]
+            return await self._fetch_dicts(_SQL_GET_SUREBETS_BY_SPORT, (sport, limit))
+        return await self._fetch_dicts(_SQL_GET_SUREBETS_ALL, (limit,))
     
     async def get_stats(self) -> dict:
         """Retourne les statistiques globales."""
-        # Total surebets
-        cursor = await self._conn.execute("SELECT COUNT(*) FROM surebets")
-        total = (await cursor.fetchone())[0]
+        async with self._reader() as reader:
+            # execute + fetchall en un seul passage par le thread aiosqlite
+            rows = await reader.execute_fetchall(_SQL_STATS)
         
-        # Profit total
-        cursor = await self._conn.execute("SELECT SUM(profit_pct) FROM surebets")
-        total_profit = (await cursor.fetchone())[0] or 0
-        
-        # Par sport
-        cursor = await self._conn.execute("""
-            SELECT sport, COUNT(*) as count, SUM(profit_pct) as profit
-            FROM surebets GROUP BY sport ORDER BY count DESC
-        """)
-        by_sport = await cursor.fetchall()
-        
-        # Par marché
-        cursor = await self._conn.execute("""
-            SELECT market, COUNT(*) as count, AVG(profit_pct) as avg_profit
-            FROM surebets GROUP BY market ORDER BY count DESC LIMIT 10
-        """)
-        by_market = await cursor.fetchall()
+        total, total_profit = 0, 0
+        by_sport, by_market = [], []
+        for k, name, count, value in rows:
+            if k == 0:
+                total, total_profit = count or 0, value or 0
+            elif k == 1:
+                by_sport.append((name, count, value))
+            else:
+                by_market.append((name, count, value))
         
         return {
             "total_surebets": total,
@@ -219,163 +676,185 @@ class Database:
     # === API USAGE ===
     
     async def log_api_usage(self, api_key: str, used: int, remaining: int):
-        """Enregistre l'usage de l'API."""
-        await self._conn.execute("""
-            INSERT INTO api_usage (api_key, requests_used, requests_remaining)
-            VALUES (?, ?, ?)
-        """, (api_key[:8] + "...", used, remaining))
-        await self._conn.commit()
+        """Enregistre l'usage de l'API (api_key déjà abrégée, voir APIKey.short)."""
+        await self._write(_SQL_INSERT_API_USAGE, (int(time.time()), api_key, used, remaining))
     
     async def get_api_usage(self, limit: int = 100) -> list[dict]:
         """Récupère l'historique d'usage API."""
-        cursor = await self._conn.execute("""
-            SELECT * FROM api_usage ORDER BY timestamp DESC LIMIT ?
-        """, (limit,))
-        rows = await cursor.fetchall()
-        columns = [d[0] for d in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+        return await self._fetch_dicts(_SQL_GET_API_USAGE, (limit,))
     
     # === LOGS ===
     
     async def add_log(self, level: str, message: str):
         """Ajoute un log."""
-        await self._conn.execute("""
-            INSERT INTO logs (level, message) VALUES (?, ?)
-        """, (level, message))
-        await self._conn.commit()
+        await self._write(_SQL_INSERT_LOG, (int(time.time()), level, message))
     
     async def get_logs(self, limit: int = 100, level: str = None) -> list[dict]:
         """Récupère les logs."""
-        query = "SELECT * FROM logs"
-        params = []
-        
         if level:
-            query += " WHERE level = ?"
-            params.append(level)
-        
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor = await self._conn.execute(query, params)
-        rows = await cursor.fetchall()
-        columns = [d[0] for d in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+            return await self._fetch_dicts(_SQL_GET_LOGS_BY_LEVEL, (level, limit))
+        return await self._fetch_dicts(_SQL_GET_LOGS_ALL, (limit,))
     
     # === RAW ODDS (Données brutes pour analyse) ===
     
     async def save_raw_odds(self, sport: str, match: str, market: str, 
                             bookmaker: str, outcome: str, odds: float):
-        """Enregistre une cote brute."""
-        implied_prob = 1 / odds if odds > 0 else 0
-        await self._conn.execute("""
-            INSERT INTO raw_odds (sport, match, market, bookmaker, outcome, odds, implied_prob)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (sport, match, market, bookmaker, outcome, odds, implied_prob))
-    
-    async def save_raw_odds_batch(self, odds_list: list[dict]):
-        """Enregistre un lot de cotes brutes avec transaction (plus efficace)."""
+        """Met une cote brute en tampon (écrite par lots, voir RAW_ODDS_BUFFER_*).
+        
+        Préférer save_raw_odds_batch ; flush() / close() vident le tampon.
+        """
+        if odds <= 0:
+            return
+        if not self._raw_odds_buffer:
+            self._raw_odds_buffer_since = time.monotonic()
+        self._raw_odds_buffer.append((int(time.time()), sport, match, market, bookmaker, outcome, odds, 1 / odds))
+        
+        if (len(self._raw_odds_buffer) >= self.RAW_ODDS_BUFFER_ROWS
+                or time.monotonic() - self._raw_odds_buffer_since >= self.RAW_ODDS_BUFFER_SECONDS):
+            await self._flush_raw_odds_buffer()
+    
+    async def _flush_raw_odds_buffer(self):
+        """Écrit les cotes brutes unitaires en attente."""
+        if self._raw_odds_buffer:
+            data, self._raw_odds_buffer = self._raw_odds_buffer, []
+            await self._insert_raw_odds(data)
+    
+    async def _insert_raw_odds(self, data: list[tuple]):
+        """Insère des lignes de cotes brutes par INSERT multi-VALUES, en une transaction.
+        
+        Les noms sont remplacés par leurs IDs de dimension. Les noms absents du
+        cache sont insérés puis relus dans la transaction du writer : un lot
+        annulé n'attribue aucun ID, et le cache ne reçoit que des IDs commités.
+        """
+        cached = [self._dimension_ids[dim] for dim in _RAW_ODDS_DIMENSIONS]
+        new_names = [
+            {row[k + 1] for row in data} - cache.keys()
+            for k, cache in enumerate(cached)
+        ]
+        
+        async def write(conn: aiosqlite.Connection) -> list[dict[str, int]]:
+            resolved = []
+            for dim, names in zip(_RAW_ODDS_DIMENSIONS, new_names):
+                ids = {}
+                if names:
+                    names = list(names)
+                    await conn.executemany(
+                        f"INSERT OR IGNORE INTO dim_{dim} (name) VALUES (?)",
+                        [(name,) for name in names]
+                    )
+                    for i in range(0, len(names), _DIMENSION_NAMES_PER_SELECT):
+                        chunk = names[i:i + _DIMENSION_NAMES_PER_SELECT]
+                        cursor = await conn.execute(
+                            f"SELECT name, id FROM dim_{dim} WHERE name IN"
+                            f" ({', '.join(['?'] * len(chunk))})",
+                            chunk
+                        )
+                        ids.update(await cursor.fetchall())
+                resolved.append(ids)
+            
+            sports, matches, markets, bookmakers, outcomes = (
+                {**cache, **ids} if ids else cache
+                for cache, ids in zip(cached, resolved)
+            )
+            rows = [
+                (ts, sports[sport], matches[match], markets[market],
+                 bookmakers[bookmaker], outcomes[outcome], odds, implied_prob)
+                for ts, sport, match, market, bookmaker, outcome, odds, implied_prob in data
+            ]
+            
+            per_insert = _RAW_ODDS_ROWS_PER_INSERT
+            full = len(rows) - len(rows) % per_insert
+            if full:
+                # Blocs complets : une requête fixe, paramètres aplatis par bloc
+                await conn.executemany(
+                    _sql_multi_values(_SQL_INSERT_RAW_ODDS_HEAD, 8, per_insert),
+                    [list(chain.from_iterable(rows[i:i + per_insert]))
+                     for i in range(0, full, per_insert)]
+                )
+            if full < len(rows):
+                rest = rows[full:]
+                await conn.execute(
+                    _sql_multi_values(_SQL_INSERT_RAW_ODDS_HEAD, 8, len(rest)),
+                    list(chain.from_iterable(rest))
+                )
+            return resolved
+        
+        resolved = await self._write(write, None)
+        # Commit effectué : ces IDs sont définitifs
+        for cache, ids in zip(cached, resolved):
+            cache.update(ids)
+    
+    async def save_raw_odds_batch(
+        self, odds_list: Union[list[tuple], list[dict], RawOddsBatch]
+    ):
+        """Enregistre un lot de cotes brutes avec transaction (plus efficace).
+        
+        Accepte un RawOddsBatch (colonnes), une liste de tuples
+        (sport, match, market, bookmaker, outcome, odds) ou une liste de dicts.
+        """
         if not odds_list:
             return
         
-        data = []
-        for o in odds_list:
-            odds_val = o.get("odds", 0)
-            # Validation: ignorer les cotes invalides
-            if odds_val <= 0:
-                continue
-            implied_prob = 1 / odds_val if odds_val > 0 else 0
-            data.append((
-                o.get("sport", ""),
-                o.get("match", ""),
-                o.get("market", ""),
-                o.get("bookmaker", ""),
-                o.get("outcome", ""),
-                odds_val,
-                implied_prob
-            ))
+        if isinstance(odds_list, RawOddsBatch):
+            rows = odds_list.rows()
+        elif isinstance(odds_list[0], dict):
+            # Ancien format : conversion en tuples (clés manquantes -> "")
+            rows = [
+                (o.get("sport", ""), o.get("match", ""), o.get("market", ""),
+                 o.get("bookmaker", ""), o.get("outcome", ""), o.get("odds", 0))
+                for o in odds_list
+            ]
+        else:
+            rows = odds_list
+        
+        now = int(time.time())
+        # Validation: ignorer les cotes invalides
+        data = [
+            (now, sport, match, market, bookmaker, outcome, odds_val, 1 / odds_val)
+            for sport, match, market, bookmaker, outcome, odds_val in rows
+            if odds_val > 0
+        ]
         
         if not data:
             return
         
         try:
-            # Utiliser une transaction explicite pour garantir l'intégrité
-            await self._conn.execute("BEGIN")
-            await self._conn.executemany("""
-                INSERT INTO raw_odds (sport, match, market, bookmaker, outcome, odds, implied_prob)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, data)
-            await self._conn.commit()
+            # Lot entier dans la transaction du writer (rollback en cas d'erreur)
+            await self._insert_raw_odds(data)
         except Exception as e:
-            # Rollback en cas d'erreur
-            await self._conn.rollback()
             raise Exception(f"Erreur lors de la sauvegarde batch des cotes: {e}") from e
     
     async def get_raw_odds(self, limit: int = 1000, sport: str = None) -> list[dict]:
         """Récupère les cotes brutes."""
-        query = "SELECT * FROM raw_odds"
-        params = []
-        
         if sport:
-            query += " WHERE sport = ?"
-            params.append(sport)
-        
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor = await self._conn.execute(query, params)
-        rows = await cursor.fetchall()
-        columns = [d[0] for d in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+            return await self._fetch_dicts(_SQL_GET_RAW_ODDS_BY_SPORT, (sport, limit))
+        return await self._fetch_dicts(_SQL_GET_RAW_ODDS_ALL, (limit,))
     
     # === VALUE BETS ===
 
     async def save_value_bet(self, record: ValueBetRecord) -> int:
         """Sauvegarde un value bet et retourne son ID."""
-        cursor = await self._conn.execute("""
-            INSERT INTO value_bets
-            (detected_at, sport, league, match, market, outcome, bookmaker,
-             odds, consensus_prob, value_pct, bookmakers_count, notified)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            record.detected_at, record.sport, record.league, record.match,
+        return await self._write(_SQL_INSERT_VALUE_BET, (
+            int(record.detected_at.timestamp()), record.sport, record.league, record.match,
             record.market, record.outcome, record.bookmaker, record.odds,
             record.consensus_prob, record.value_pct, record.bookmakers_count,
             record.notified
-        ))
-        await self._conn.commit()
-        return cursor.lastrowid
+        ), need_id=True)
 
     async def get_value_bets(self, limit: int = 100, sport: str = None) -> list[dict]:
         """Récupère les derniers value bets."""
-        query = "SELECT * FROM value_bets"
-        params = []
         if sport:
-            query += " WHERE sport = ?"
-            params.append(sport)
-        query += " ORDER BY detected_at DESC LIMIT ?"
-        params.append(limit)
-        cursor = await self._conn.execute(query, params)
-        rows = await cursor.fetchall()
-        columns = [d[0] for d in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+            return await self._fetch_dicts(_SQL_GET_VALUE_BETS_BY_SPORT, (sport, limit))
+        return await self._fetch_dicts(_SQL_GET_VALUE_BETS_ALL, (limit,))
 
     # === SCANS (Statistiques de scan) ===
     
     async def save_scan(self, sports_scanned: int, events_found: int, 
                         surebets_found: int, api_key: str, requests_remaining: int):
-        """Enregistre les statistiques d'un scan."""
-        await self._conn.execute("""
-            INSERT INTO scans (sports_scanned, events_found, surebets_found, api_key, requests_remaining)
-            VALUES (?, ?, ?, ?, ?)
-        """, (sports_scanned, events_found, surebets_found, api_key[:8] + "..." if api_key else None, requests_remaining))
-        await self._conn.commit()
+        """Enregistre les statistiques d'un scan (api_key déjà abrégée, voir APIKey.short)."""
+        await self._write(_SQL_INSERT_SCAN, (int(time.time()), sports_scanned, events_found, surebets_found, api_key or None, requests_remaining))
     
     async def get_scans(self, limit: int = 100) -> list[dict]:
         """Récupère l'historique des scans."""
-        cursor = await self._conn.execute("""
-            SELECT * FROM scans ORDER BY timestamp DESC LIMIT ?
-        """, (limit,))
-        rows = await cursor.fetchall()
-        columns = [d[0] for d in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+        return await self._fetch_dicts(_SQL_GET_SCANS, (limit,))
 
@@ -21,16 +21,24 @@ sys.path.insert(0, str(Path(__file__).parent))
 from config import (
     API_KEYS_FILE, DB_FILE, LOG_FILE,
     TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-    SCAN_INTERVAL, REQUEST_DELAY, COOLDOWN_MINUTES, BOOKMAKERS,
+    SCAN_INTERVAL, REQUEST_DELAY, COOLDOWN_MINUTES, MAX_CONCURRENT_SCANS, BOOKMAKERS,
     FOOTBALL_LEAGUES, BASKETBALL_LEAGUES, TENNIS_TOURNAMENTS, NFL_LEAGUES
 )
 from core.api_manager import APIManager
+from core.odds_client import create_app_session
 from core.scanner import SurebetScanner
 from core.scheduler import SmartScheduler
 from notifications.telegram_bot import TelegramBot
 from data.database import Database
 from utils.logger import setup_logger
 
+# uvloop (optionnel, Linux/macOS) : boucle asyncio basée sur libuv, plus rapide.
+# Absent (ex: Windows) → boucle asyncio standard.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 async def run_bot():
     """Fonction principale du bot."""
@@ -67,6 +75,9 @@ async def run_bot():
     await db.connect()
     logger.info("Base de données connectée")
     
+    # Session HTTP unique pour tous les appels à The Odds API
+    http_session = create_app_session()
+    
     # Créer le scanner avec scheduler intelligent
     scanner = SurebetScanner(
         api_manager=api_manager,
@@ -76,7 +87,9 @@ async def run_bot():
         cooldown_minutes=COOLDOWN_MINUTES,
         bookmakers=BOOKMAKERS,
         request_delay=REQUEST_DELAY,
-        scheduler=scheduler
+        scheduler=scheduler,
+        max_concurrency=MAX_CONCURRENT_SCANS,
+        session=http_session
     )
     
     # Sports à scanner (commencer par les plus actifs)
@@ -99,6 +112,7 @@ async def run_bot():
         await telegram.send_error(str(e))
     finally:
         await scanner.stop()
+        await http_session.close()
         await db.close()
         await telegram.close()
         logger.info("Bot arrêté proprement")
@@ -131,6 +145,9 @@ def main():
     if args.dashboard:
         run_dashboard()
     else:
+        # uvloop.run crée sa propre boucle (uvloop.install est déprécié)
+        if uvloop is not None:
+            return uvloop.run(run_bot())
         return asyncio.run(run_bot())
 
 
@@ -1,9 +1,33 @@
 # Bot Telegram pour les alertes Surebet
 
+import asyncio
 import aiohttp
 from typing import Optional
 
 
+# Rapport de status : gabarit figé, seules les valeurs sont substituées
+_STATUS_TEMPLATE = "\n".join([
+    "📊 <b>STATUS BOT SUREBET</b>",
+    "━━━━━━━━━━━━━━━━━━━━━━━━",
+    "⏱ Uptime: {uptime}",
+    "🔑 Clé API: {api_key}",
+    "📡 Requêtes restantes: {requests_remaining}",
+    "🎯 Surebets détectés: {surebets_count}",
+    "📈 Profit total: {total_profit:.2f}%",
+    "━━━━━━━━━━━━━━━━━━━━━━━━",
+    "<b>VDO Group</b>",
+])
+
+# Valeurs affichées quand le status ne fournit pas le champ
+_STATUS_DEFAULTS = {
+    "uptime": "N/A",
+    "api_key": "N/A",
+    "requests_remaining": "N/A",
+    "surebets_count": 0,
+    "total_profit": 0,
+}
+
+
 class TelegramBot:
     """Bot Telegram pour envoyer les alertes Surebet.
     
@@ -11,6 +35,9 @@ class TelegramBot:
     """
     
     API_URL = "https://api.telegram.org/bot{token}/{method}"
+    MAX_MESSAGE_LENGTH = 4096  # Limite Telegram par message
+    COMMAND_POLL_TIMEOUT = 25  # Long polling getUpdates (secondes)
+    COMMAND_RETRY_DELAY = 5  # Pause après un échec de polling (secondes)
     
     def __init__(self, token: str, chat_id: str):
         self.token = token
@@ -19,15 +46,26 @@ class TelegramBot:
         self._last_update_id = 0  # Pour le polling des messages
         self._stop_callback = None  # Callback pour arrêter le scanner
         self._status_callback = None  # Callback pour obtenir le status
+        self._command_task: Optional[asyncio.Task] = None  # Écoute des commandes
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Retourne ou crée une session HTTP."""
+        """Retourne ou crée la session HTTP (connexions TLS gardées en keep-alive)."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=10,
+                    limit_per_host=4,
+                    keepalive_timeout=75,
+                    ttl_dns_cache=300
+                ),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
         return self._session
     
     async def close(self):
-        """Ferme la session HTTP."""
+        """Arrête l'écoute des commandes et ferme la session HTTP."""
+        await self.stop_command_listener()
         if self._session and not self._session.closed:
             await self._session.close()
     
@@ -37,8 +75,8 @@ class TelegramBot:
         url = self.API_URL.format(token=self.token, method=method)
         
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with session.post(url, data=data, timeout=timeout) as resp:
+            # Corps JSON : types préservés (chat_id, booléens), un seul Content-Type
+            async with session.post(url, json=data) as resp:
                 return resp.status == 200
         except Exception as e:
             print(f"[Telegram] ❌ Erreur appel API ({method}): {e}")
@@ -113,6 +151,71 @@ class TelegramBot:
 
         return await self.send_message("\n".join(lines))
     
+    async def send_surebets_digest(self, surebets: list[dict], detected_at: str = None) -> bool:
+        """Envoie plusieurs surebets dans un seul message (découpé si trop long).
+        
+        Chaque dict reprend les arguments de send_surebet_alert
+        (league, match, market, outcomes, profit_pct, stakes).
+        """
+        from datetime import datetime
+        
+        ts = detected_at or datetime.now().strftime("%H:%M:%S")
+        header = f"⚡ <b>{len(surebets)} SUREBETS</b>"
+        footer = f"⏱ <i>{ts}</i>"
+        
+        blocks = []
+        for sb in surebets:
+            stakes = sb.get("stakes", [])
+            block = [
+                f"⚽ <b>{sb['match']}</b>  |  {sb['market']}  —  {sb['league']}",
+                f"📈 <code>+{sb['profit_pct']:.2f}%</code>",
+            ]
+            for i, outcome in enumerate(sb["outcomes"]):
+                stake = stakes[i] if i < len(stakes) else 0
+                block.append(
+                    f"🎯 <b>{outcome['bookmaker']}</b>  →  {outcome['name']}  @  "
+                    f"<code>{outcome['odds']:.2f}</code>  |  <code>{stake:.2f}€</code>"
+                )
+            blocks.append("\n".join(block))
+        
+        ok = True
+        for text in self._split_digest(header, blocks, footer):
+            ok = await self.send_message(text) and ok
+        return ok
+    
+    def _split_digest(self, header: str, blocks: list[str], footer: str) -> list[str]:
+        """Regroupe les blocs en messages sous MAX_MESSAGE_LENGTH (en-tête et pied sur chacun).
+        
+        Un bloc trop long pour un message seul est coupé entre ses lignes ;
+        une ligne seule trop longue est tronquée.
+        """
+        budget = self.MAX_MESSAGE_LENGTH - len(header) - len(footer) - 4
+        pieces = []
+        for block in blocks:
+            if len(block) <= budget:
+                pieces.append(block)
+                continue
+            piece = ""
+            for line in block.split("\n"):
+                if len(line) > budget:
+                    line = line[:budget - 1] + "…"
+                if piece and len(piece) + len(line) + 1 > budget:
+                    pieces.append(piece)
+                    piece = ""
+                piece = f"{piece}\n{line}" if piece else line
+            pieces.append(piece)
+        
+        # Un message tant que la limite Telegram le permet, sinon plusieurs
+        messages = []
+        current = header
+        for piece in pieces:
+            if current != header and len(current) + len(piece) + len(footer) + 4 > self.MAX_MESSAGE_LENGTH:
+                messages.append(f"{current}\n\n{footer}")
+                current = header
+            current = f"{current}\n\n{piece}"
+        messages.append(f"{current}\n\n{footer}")
+        return messages
+    
     async def send_value_bet_alert(
         self,
         sport: str,
@@ -154,18 +257,9 @@ class TelegramBot:
 
     async def send_status(self, status: dict) -> bool:
         """Envoie un rapport de status."""
-        lines = [
-            "📊 <b>STATUS BOT SUREBET</b>",
-            "━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"⏱ Uptime: {status.get('uptime', 'N/A')}",
-            f"🔑 Clé API: {status.get('api_key', 'N/A')}",
-            f"📡 Requêtes restantes: {status.get('requests_remaining', 'N/A')}",
-            f"🎯 Surebets détectés: {status.get('surebets_count', 0)}",
-            f"📈 Profit total: {status.get('total_profit', 0):.2f}%",
-            "━━━━━━━━━━━━━━━━━━━━━━━━",
-            "<b>VDO Group</b>"
-        ]
-        return await self.send_message("\n".join(lines))
+        return await self.send_message(
+            _STATUS_TEMPLATE.format_map({**_STATUS_DEFAULTS, **status})
+        )
     
     async def send_error(self, error: str) -> bool:
         """Envoie une alerte d'erreur."""
@@ -194,74 +288,121 @@ class TelegramBot:
         self._stop_callback = stop_callback
         self._status_callback = status_callback
     
-    async def check_commands(self) -> list[str]:
+    async def check_commands(self, timeout: int = 0) -> list[str]:
         """
         Vérifie les nouvelles commandes reçues.
         
+        Args:
+            timeout: Long polling en secondes (0 = non-bloquant)
+        
         Returns:
             Liste des commandes reçues (ex: ["/stop", "/status"])
         """
+        try:
+            return await self._poll_commands(timeout)
+        except Exception as e:
+            print(f"[Telegram] Erreur check_commands: {e}")
+            return []
+    
+    async def _poll_commands(self, timeout: int) -> list[str]:
+        """Un appel getUpdates : Telegram garde la requête ouverte jusqu'à `timeout` s."""
         session = await self._get_session()
         url = self.API_URL.format(token=self.token, method="getUpdates")
         
         commands = []
+        params = {
+            "offset": self._last_update_id + 1,
+            "timeout": timeout,
+            "allowed_updates": '["message"]'
+        }
         
-        try:
-            params = {
-                "offset": self._last_update_id + 1,
-                "timeout": 0,  # Non-bloquant
-                "allowed_updates": ["message"]
-            }
-            
-            async with session.get(url, params=params) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
+        # Marge au-delà du long polling côté serveur
+        request_timeout = aiohttp.ClientTimeout(total=timeout + 10)
+        async with session.get(url, params=params, timeout=request_timeout) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                
+                for update in data.get("result", []):
+                    self._last_update_id = update.get("update_id", self._last_update_id)
                     
-                    for update in data.get("result", []):
-                        self._last_update_id = update.get("update_id", self._last_update_id)
-                        
-                        message = update.get("message", {})
-                        text = message.get("text", "")
-                        chat_id = str(message.get("chat", {}).get("id", ""))
-                        
-                        # Vérifier que c'est bien notre chat
-                        if chat_id == self.chat_id and text.startswith("/"):
-                            commands.append(text.lower().strip())
-        except Exception as e:
-            print(f"[Telegram] Erreur check_commands: {e}")
+                    message = update.get("message", {})
+                    text = message.get("text", "")
+                    chat_id = str(message.get("chat", {}).get("id", ""))
+                    
+                    # Vérifier que c'est bien notre chat
+                    if chat_id == self.chat_id and text.startswith("/"):
+                        commands.append(text.lower().strip())
         
         return commands
     
+    def start_command_listener(self):
+        """Lance l'écoute des commandes en tâche de fond (long polling continu)."""
+        if self._command_task is None or self._command_task.done():
+            self._command_task = asyncio.create_task(self._command_loop())
+    
+    async def stop_command_listener(self):
+        """Arrête l'écoute des commandes."""
+        task, self._command_task = self._command_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    async def _command_loop(self):
+        """Une requête getUpdates tenue ouverte à la fois ; commandes exécutées dès réception."""
+        while True:
+            try:
+                commands = await self._poll_commands(self.COMMAND_POLL_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Telegram] Erreur écoute commandes: {e}")
+                await asyncio.sleep(self.COMMAND_RETRY_DELAY)
+                continue
+            
+            for cmd in commands:
+                # Une commande en échec (callback, formatage) ne doit pas arrêter l'écoute
+                try:
+                    await self._execute_command(cmd)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"[Telegram] Erreur commande {cmd}: {e}")
+    
     async def handle_commands(self):
         """
-        Vérifie et exécute les commandes reçues.
+        Vérifie et exécute les commandes reçues (appel ponctuel, non-bloquant).
         
         Commandes supportées:
         - /stop : Arrête le bot
         - /status : Affiche le status
         """
-        commands = await self.check_commands()
+        for cmd in await self.check_commands():
+            await self._execute_command(cmd)
+    
+    async def _execute_command(self, cmd: str):
+        """Exécute une commande reçue."""
+        if cmd == "/stop":
+            await self.send_message("⛔ Commande /stop reçue. Arrêt en cours...")
+            if self._stop_callback:
+                self._stop_callback()
         
-        for cmd in commands:
-            if cmd == "/stop":
-                await self.send_message("⛔ Commande /stop reçue. Arrêt en cours...")
-                if self._stop_callback:
-                    self._stop_callback()
-            
-            elif cmd == "/status":
-                if self._status_callback:
-                    status = self._status_callback()
-                    await self.send_status(status)
-                else:
-                    await self.send_message("📊 Status non disponible")
-            
-            elif cmd == "/help":
-                await self.send_message(
-                    "📖 <b>Commandes disponibles</b>\n\n"
-                    "/stop - Arrête le bot\n"
-                    "/status - Affiche le status du bot\n"
-                    "/help - Affiche cette aide"
-                )
+        elif cmd == "/status":
+            if self._status_callback:
+                status = self._status_callback()
+                await self.send_status(status)
+            else:
+                await self.send_message("📊 Status non disponible")
+        
+        elif cmd == "/help":
+            await self.send_message(
+                "📖 <b>Commandes disponibles</b>\n\n"
+                "/stop - Arrête le bot\n"
+                "/status - Affiche le status du bot\n"
+                "/help - Affiche cette aide"
+            )
 
 
 # === TEST ===
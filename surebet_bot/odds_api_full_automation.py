@@ -12,13 +12,17 @@ Modules:
   automation/registration    - Inscription site web
 """
 
+import asyncio
 import sys
 import os
 import time
 import threading
 import traceback
+from collections import OrderedDict
 from pathlib import Path
 
+import aiohttp
+
 # Répertoire du script
 SCRIPT_DIR = Path(__file__).resolve().parent
 
@@ -42,13 +46,20 @@ if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
 # Imports des modules
 from automation.telegram_relay import (
     send_telegram_message,
-    get_telegram_messages,
+    send_telegram_message_async,
+    get_telegram_messages_async,
     check_telegram_bot,
 )
 from automation.mail_tm import create_mail_tm_account, get_api_key_from_email
 from automation.registration import register_odds_api, generate_random_name
 
 
+# Long polling des commandes (secondes, max ~50 côté Telegram)
+COMMAND_POLL_TIMEOUT = 25
+
+# Commandes reconnues par le poller
+COMMANDS = ("/launch", "/status", "/help")
+
 # ============================================
 # État global
 # ============================================
@@ -138,69 +149,101 @@ def run_registration_process(name: str = None):
 
 
 # ============================================
-# Commandes Telegram (thread)
+# Commandes Telegram (thread, boucle asyncio)
 # ============================================
 def check_telegram_commands():
-    """Vérifie les commandes Telegram en continu (thread daemon)."""
-    last_update_id = 0
-    processed = set()
+    """Vérifie les commandes Telegram en continu (thread daemon, boucle asyncio dédiée)."""
+    asyncio.run(_poll_commands())
 
-    while True:
-        try:
-            messages = get_telegram_messages(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, last_update_id)
 
-            for msg in messages:
-                uid = msg["update_id"]
-                last_update_id = max(last_update_id, uid)
-                text = msg["text"].strip().lower()
+async def _poll_commands():
+    """Long polling des commandes via aiohttp (une connexion keep-alive)."""
+    last_update_id = 0
+    # update_id déjà traités (unique par update), éviction FIFO en O(1)
+    processed = OrderedDict()
 
-                key = f"{uid}_{text}"
-                if key in processed:
+    connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=60)
+    # Timeout HTTP au-delà du long polling Telegram
+    timeout = aiohttp.ClientTimeout(total=COMMAND_POLL_TIMEOUT + 5)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        while True:
+            try:
+                # Inscription en cours : l'attente captcha possède getUpdates
+                # (deux pollers concurrents se coupent en 409 et se volent les codes)
+                if _registration_state.get("running"):
+                    await asyncio.sleep(2)
                     continue
-                processed.add(key)
-
-                if len(processed) > 100:
-                    processed = set(list(processed)[-50:])
-
-                if text == "/launch":
-                    if _registration_state.get("running"):
-                        send_telegram_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                                              "⚠️ Processus déjà en cours")
-                    else:
-                        send_telegram_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                                              "🚀 Lancement inscription...")
-                        _registration_state["running"] = True
-                        threading.Thread(
-                            target=run_registration_process,
-                            args=(_registration_state.get("name"),),
-                            daemon=True
-                        ).start()
-
-                elif text == "/status":
-                    running = _registration_state.get("running")
-                    name = _registration_state.get("name", "N/A")
-                    email = _registration_state.get("email", "N/A")
-                    status = "🔄 En cours" if running else "⏸️ Arrêté"
-                    send_telegram_message(
-                        TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                        f"📊 <b>STATUS</b>\n\n"
-                        f"{status}\n👤 {name}\n📧 {email}"
-                    )
-
-                elif text == "/help":
-                    send_telegram_message(
-                        TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                        "📖 <b>Commandes</b>\n\n"
-                        "/launch - Lancer l'inscription\n"
-                        "/status - Status actuel\n"
-                        "/help - Cette aide"
-                    )
-
-            time.sleep(2)
-
-        except Exception as e:
-            print(f"[COMMANDE] Erreur: {e}")
-            time.sleep(5)
+
+                poll_start = time.monotonic()
+                messages = await get_telegram_messages_async(
+                    session, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, last_update_id,
+                    timeout=COMMAND_POLL_TIMEOUT
+                )
+
+                for msg in messages:
+                    uid = msg["update_id"]
+                    text = msg["text"].strip().lower()
+
+                    # Poll lancé avant l'inscription : un texte libre est une réponse
+                    # pour l'attente captcha, ne pas confirmer son offset
+                    if _registration_state.get("running") and text not in COMMANDS:
+                        break
+                    last_update_id = max(last_update_id, uid)
+
+                    if uid in processed:
+                        continue
+                    processed[uid] = None
+                    if len(processed) > 100:
+                        processed.popitem(last=False)
+
+                    await _handle_command(session, text)
+
+                # Retour anticipé sans message : erreur ou conflit avec un autre
+                # getUpdates (attente captcha) -> lui laisser la main un moment
+                if not messages and time.monotonic() - poll_start < COMMAND_POLL_TIMEOUT:
+                    await asyncio.sleep(2)
+
+            except Exception as e:
+                print(f"[COMMANDE] Erreur: {e}")
+                await asyncio.sleep(5)
+
+
+async def _handle_command(session, text: str):
+    """Exécute une commande Telegram."""
+    async def reply(message: str):
+        await send_telegram_message_async(session, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, message)
+
+    if text == "/launch":
+        if _registration_state.get("running"):
+            await reply("⚠️ Processus déjà en cours")
+        else:
+            await reply("🚀 Lancement inscription...")
+            _registration_state["running"] = True
+            # Playwright sync : l'inscription reste dans son propre thread
+            threading.Thread(
+                target=run_registration_process,
+                args=(_registration_state.get("name"),),
+                daemon=True
+            ).start()
+
+    elif text == "/status":
+        running = _registration_state.get("running")
+        name = _registration_state.get("name", "N/A")
+        email = _registration_state.get("email", "N/A")
+        status = "🔄 En cours" if running else "⏸️ Arrêté"
+        await reply(
+            f"📊 <b>STATUS</b>\n\n"
+            f"{status}\n👤 {name}\n📧 {email}"
+        )
+
+    elif text == "/help":
+        await reply(
+            "📖 <b>Commandes</b>\n\n"
+            "/launch - Lancer l'inscription\n"
+            "/status - Status actuel\n"
+            "/help - Cette aide"
+        )
 
 
 # ============================================
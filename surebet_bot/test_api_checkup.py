@@ -678,8 +678,17 @@ async def test_database():
             f"Total: {stats['total_surebets']} | Profit: {stats['total_profit_pct']}%"
         )
         
+        # 8.4b: Sauvegarde groupée de surebets
+        await db.save_surebets_many([record, record])
+        surebets = await db.get_surebets(limit=10)
+        results.add(
+            "DB save surebets many",
+            len(surebets) == 3,
+            f"{len(surebets)} surebet(s) après sauvegarde groupée"
+        )
+        
         # 8.5: Log API usage
-        await db.log_api_usage("test_key_12345678", 5, 495)
+        await db.log_api_usage("test_key...", 5, 495)
         usage = await db.get_api_usage(limit=1)
         results.add(
             "DB log API usage",
@@ -696,6 +705,22 @@ async def test_database():
             f"{len(logs)} log(s) récupéré(s)"
         )
         
+        # 8.6b: Une écriture invalide dans un commit groupé n'échoue qu'elle-même
+        grouped = await asyncio.gather(
+            db.add_log("INFO", "avant"),
+            db.log_api_usage(None, 1, 2),  # api_key NOT NULL
+            db.add_log("INFO", "après"),
+            return_exceptions=True
+        )
+        messages = [log["message"] for log in await db.get_logs(limit=2)]
+        results.add(
+            "DB commit groupé: échec isolé",
+            grouped[0] is None and grouped[2] is None
+            and isinstance(grouped[1], Exception)
+            and messages == ["après", "avant"],
+            f"Résultats: {[type(g).__name__ for g in grouped]} | Logs: {messages}"
+        )
+        
         # 8.7: Raw odds batch
         raw_batch = [
             {"sport": "Football", "match": "PSG vs OM", "market": "h2h", 
@@ -722,8 +747,52 @@ async def test_database():
                 f"implied_prob={raw_odds[0]['implied_prob']:.4f}" if has_prob else "Non calculée"
             )
         
+        # Lot de tuples (sport, match, market, bookmaker, outcome, odds), cote nulle ignorée
+        await db.save_raw_odds_batch([
+            ("Tennis", "Nadal vs Federer", "h2h", "Unibet", "Home", 2.10),
+            ("Tennis", "Nadal vs Federer", "h2h", "Unibet", "Away", 0),
+        ])
+        tennis_odds = await db.get_raw_odds(limit=10, sport="Tennis")
+        results.add(
+            "DB save raw odds batch (tuples)",
+            len(tennis_odds) == 1 and tennis_odds[0]["odds"] == 2.10,
+            f"{len(tennis_odds)} cote(s) Tennis enregistrée(s)"
+        )
+        
+        # Lot en échec (cote NULL) pendant qu'un lot valide réutilisant un de ses
+        # noms nouveaux attend le commit suivant, puis un lot aux noms nouveaux :
+        # chaque ligne garde ses propres noms
+        now = int(datetime.now().timestamp())
+        failed = asyncio.create_task(db._insert_raw_odds([
+            (now, "Golf", "Woods vs Mickelson", "h2h", "Betfair", "Home", None, None),
+        ]))
+        for _ in range(3):
+            await asyncio.sleep(0)  # Le lot en échec occupe le writer
+        queued = asyncio.create_task(db._insert_raw_odds([
+            (now, "Rugby", "France vs Irlande", "h2h", "Betfair", "Away", 1.90, 1 / 1.90),
+        ]))
+        failed_ok = False
+        try:
+            await failed
+        except Exception:
+            failed_ok = True
+        await asyncio.gather(queued, db.save_raw_odds_batch([
+            ("Golf", "Woods vs Mickelson", "spreads", "PMU", "Over", 3.00),
+        ]))
+        names = {
+            r["sport"]: (r["match"], r["market"], r["bookmaker"], r["outcome"], r["odds"])
+            for r in await db.get_raw_odds(limit=10)
+        }
+        results.add(
+            "DB raw odds: lot annulé sans effet sur les IDs de dimension",
+            failed_ok
+            and names.get("Rugby") == ("France vs Irlande", "h2h", "Betfair", "Away", 1.90)
+            and names.get("Golf") == ("Woods vs Mickelson", "spreads", "PMU", "Over", 3.00),
+            f"Rugby={names.get('Rugby')} | Golf={names.get('Golf')}"
+        )
+        
         # 8.8: Scans
-        await db.save_scan(18, 45, 0, "test_key_12345678", 490)
+        await db.save_scan(18, 45, 0, "test_key...", 490)
         scans = await db.get_scans(limit=1)
         results.add(
             "DB save/get scans",
@@ -841,7 +910,7 @@ async def test_scanner_logic():
         totals = markets["totals"]
         results.add(
             "Extract totals - Over/Under",
-            "Over 2.5" in totals and "Under 2.5" in totals,
+            ("Over", 2.5) in totals and ("Under", 2.5) in totals,
             f"Outcomes: {list(totals.keys())}"
         )
     
@@ -870,8 +939,8 @@ async def test_scanner_logic():
     # 9.4: Simuler un surebet réel sur totals 
     # Over=2.10 chez Betclic + Under=2.10 chez Winamax → L = 0.952 < 1
     surebet_market = {
-        "Over 2.5": [("Betclic", 2.10), ("Unibet", 1.90)],
-        "Under 2.5": [("Winamax", 2.10), ("Pinnacle", 1.95)]
+        ("Over", 2.5): [("Betclic", 2.10), ("Unibet", 1.90)],
+        ("Under", 2.5): [("Winamax", 2.10), ("Pinnacle", 1.95)]
     }
     
     arb = scanner._find_totals_arbitrage(
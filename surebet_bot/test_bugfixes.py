@@ -2,16 +2,22 @@
 # Couvre: cooldown atomique, déduplication totals/spreads, scheduler nouveaux créneaux
 
 import asyncio
+import logging
 import sys
 import os
+import time
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.scanner import SurebetScanner, SurebetOpportunity
 from core.calculator import SurebetResult
+from core.odds_client import AsyncLimiter, OddsClient, OddsResponse
 from core.scheduler import SmartScheduler
+from notifications.telegram_bot import TelegramBot
 from constants import SCHEDULE_SLOTS, SLOT_PRIORITY, SPORT_PRIORITY
 
 
@@ -126,7 +132,7 @@ def test_cooldown_expiration(r: TestResults):
     scanner._check_and_add_cooldown("match_expiry_test")
 
     # Forcer l'expiration en reculant le timestamp
-    scanner.cooldown_cache["match_expiry_test"] = datetime.now() - timedelta(seconds=1)
+    scanner.cooldown_cache["match_expiry_test"] = time.monotonic() - 1
 
     # Doit retourner False (expiré)
     result = scanner._check_and_add_cooldown("match_expiry_test")
@@ -182,10 +188,10 @@ def test_deduplication_spreads_multilignes(r: TestResults):
 
     # Créer les données de marché spreads manuellement
     market_data = {
-        "PSG +1.5": [("Betclic", 1.95), ("Unibet", 1.98)],
-        "OM -1.5": [("Betclic", 2.05), ("Unibet", 2.02)],
-        "PSG +2.5": [("Betclic", 1.60), ("Unibet", 1.62)],
-        "OM -2.5": [("Betclic", 2.50), ("Unibet", 2.48)],
+        ("PSG", 1.5): [("Betclic", 1.95), ("Unibet", 1.98)],
+        ("OM", -1.5): [("Betclic", 2.05), ("Unibet", 2.02)],
+        ("PSG", 2.5): [("Betclic", 1.60), ("Unibet", 1.62)],
+        ("OM", -2.5): [("Betclic", 2.50), ("Unibet", 2.48)],
     }
 
     # Arbitrage +1.5/-1.5 : 1/1.98 + 1/2.05 = 0.994 → profit ~0.6% (trop faible)
@@ -201,8 +207,8 @@ def test_deduplication_spreads_multilignes(r: TestResults):
 
     # Test avec un vrai arbitrage spread
     market_data_arbitrage = {
-        "PSG +1.5": [("Betclic", 2.10), ("Unibet", 2.08)],
-        "OM -1.5": [("Betclic", 2.10), ("Unibet", 2.08)],
+        ("PSG", 1.5): [("Betclic", 2.10), ("Unibet", 2.08)],
+        ("OM", -1.5): [("Betclic", 2.10), ("Unibet", 2.08)],
     }
     # 1/2.10 + 1/2.10 = 0.952 → profit ~4.8%
     surebet2 = scanner._find_spreads_arbitrage(
@@ -327,6 +333,250 @@ def test_scheduler_creneaux(r: TestResults):
         r.fail("Mercredi 04h00 → default", f"Reçu: {slot_name}")
 
 
+# ─── TEST 7: Quota inconnu sur erreur réseau ─────────────────────────────────
+
+def test_quota_erreur_reseau(r: TestResults):
+    print("\n[TEST 7] Quota conservé sur erreur réseau")
+
+    response = OddsResponse(success=False, error="timeout")
+    if response.requests_remaining == -1 and response.requests_used == -1:
+        r.ok("OddsResponse sans headers → quota inconnu (-1)")
+    else:
+        r.fail("OddsResponse sans headers → -1",
+               f"Reçu: {response.requests_remaining}/{response.requests_used}")
+
+    scanner = make_scanner()
+    scanner.telegram = AsyncMock()
+    scanner.requests_remaining = 321
+    scanner.db = AsyncMock()
+
+    async def scan():
+        client = OddsClient("test_key", request_delay=0.01, max_retries=0)
+        client._send = AsyncMock(side_effect=aiohttp.ClientConnectionError("down"))
+        scanner.client = client
+        scanner._client_key = scanner.api_manager.current_key
+        return await scanner._scan_sport("soccer_epl", "EPL")
+
+    # L'erreur attendue est loggée par le scanner : pas de bruit dans la sortie
+    scanner_logger = logging.getLogger("surebet_bot")
+    level = scanner_logger.level
+    scanner_logger.setLevel(logging.CRITICAL)
+    try:
+        asyncio.run(scan())
+    finally:
+        scanner_logger.setLevel(level)
+    if scanner.requests_remaining == 321:
+        r.ok("ClientError → dernier quota connu conservé")
+    else:
+        r.fail("ClientError → quota conservé", f"Reçu: {scanner.requests_remaining}")
+
+    if not scanner.db.log_api_usage.called:
+        r.ok("ClientError → aucun usage API enregistré")
+    else:
+        r.fail("ClientError → pas d'usage API", f"Appels: {scanner.db.log_api_usage.call_args_list}")
+
+
+# ─── TEST 8: Concurrence AIMD ────────────────────────────────────────────────
+
+def test_aimd_concurrence(r: TestResults):
+    print("\n[TEST 8] Concurrence AIMD (_adjust_concurrency)")
+    scanner = SurebetScanner(
+        api_manager=MagicMock(),
+        telegram=MagicMock(),
+        request_delay=1.0,
+        max_concurrency=4
+    )
+
+    # Quota bas → diminution multiplicative, délai allongé
+    scanner._adjust_concurrency(OddsResponse(success=True, status_code=200, requests_remaining=10))
+    if int(scanner._concurrency) == 2 and scanner.request_delay == 2.0:
+        r.ok("Quota bas → concurrence 4 → 2, délai 1s → 2s")
+    else:
+        r.fail("Quota bas → diminution",
+               f"Reçu: {scanner._concurrency} / {scanner.request_delay}s")
+
+    # Erreur réseau (pas de réponse HTTP) → aucun changement, même avec un quota à 0
+    scanner._adjust_concurrency(OddsResponse(success=False, error="timeout", requests_remaining=0))
+    if scanner._concurrency == 2.0 and scanner.request_delay == 2.0:
+        r.ok("Erreur réseau → concurrence et délai inchangés")
+    else:
+        r.fail("Erreur réseau → inchangé",
+               f"Reçu: {scanner._concurrency} / {scanner.request_delay}s")
+
+    # Quota confortable → augmentation additive (+0.5 par réponse)
+    for _ in range(2):
+        scanner._adjust_concurrency(OddsResponse(success=True, status_code=200, requests_remaining=500))
+    if int(scanner._concurrency) == 3 and abs(scanner.request_delay - 4 / 3) < 1e-9:
+        r.ok("Quota confortable → concurrence 2 → 3, délai 4/3s")
+    else:
+        r.fail("Quota confortable → augmentation",
+               f"Reçu: {scanner._concurrency} / {scanner.request_delay}s")
+
+    # 429 → diminution, même sans header de quota
+    scanner._adjust_concurrency(OddsResponse(success=False, status_code=429))
+    if int(scanner._concurrency) == 1:
+        r.ok("429 → concurrence 3 → 1")
+    else:
+        r.fail("429 → diminution", f"Reçu: {scanner._concurrency}")
+
+
+# ─── TEST 9: Cache de réponses borné (LRU) ───────────────────────────────────
+
+def test_cache_lru(r: TestResults):
+    print("\n[TEST 9] Cache de réponses borné (LRU)")
+
+    async def scenario():
+        client = OddsClient("test_key", request_delay=0.01)
+        client.CACHE_MAX_ENTRIES = 2
+        client._fetch = AsyncMock(side_effect=lambda *a, **k: OddsResponse(success=True, status_code=200))
+        await client._request("events/a/markets")
+        await client._request("events/b/markets")
+        await client._request("events/a/markets")  # Hit : "a" redevient la plus récente
+        await client._request("events/c/markets")
+        return client
+
+    client = asyncio.run(scenario())
+    keys = [key[0] for key in client._cache]
+    if keys == ["events/a/markets", "events/c/markets"]:
+        r.ok("Cache plein → entrée la moins récemment utilisée évincée")
+    else:
+        r.fail("Cache plein → éviction LRU", f"Clés: {keys}")
+
+    if client._fetch.await_count == 3:
+        r.ok("Entrée touchée servie depuis le cache")
+    else:
+        r.fail("Entrée touchée servie depuis le cache", f"Appels API: {client._fetch.await_count}")
+
+
+# ─── TEST 10: Découpage du digest Telegram ───────────────────────────────────
+
+def test_digest_decoupage(r: TestResults):
+    print("\n[TEST 10] Découpage du digest Telegram")
+    bot = TelegramBot("token", "chat")
+    bot.MAX_MESSAGE_LENGTH = 100
+    header, footer = "H" * 10, "F" * 10
+
+    # Bloc trop long en tête : pas de message vide (en-tête seul)
+    long_block = "\n".join(f"ligne {i} " + "x" * 20 for i in range(8))
+    messages = bot._split_digest(header, [long_block, "court"], footer)
+    if all(len(m) <= 100 for m in messages):
+        r.ok("Messages sous MAX_MESSAGE_LENGTH")
+    else:
+        r.fail("Messages sous la limite", f"Longueurs: {[len(m) for m in messages]}")
+
+    if all(m != f"{header}\n\n{footer}" for m in messages):
+        r.ok("Aucun message réduit à l'en-tête")
+    else:
+        r.fail("Pas de message vide", f"Messages: {messages}")
+
+    body = "\n".join(m[len(header) + 2:-len(footer) - 2] for m in messages)
+    if all(line in body.split("\n") for line in long_block.split("\n")) and "court" in body:
+        r.ok("Bloc trop long coupé entre ses lignes, sans perte")
+    else:
+        r.fail("Bloc coupé sans perte", f"Messages: {messages}")
+
+    # Ligne seule plus longue que la limite : tronquée
+    messages = bot._split_digest(header, ["y" * 500], footer)
+    if len(messages) == 1 and len(messages[0]) <= 100 and messages[0].endswith(f"…\n\n{footer}"):
+        r.ok("Ligne trop longue tronquée")
+    else:
+        r.fail("Ligne trop longue tronquée", f"Longueurs: {[len(m) for m in messages]}")
+
+    # Blocs courts : regroupés dans un seul message
+    messages = bot._split_digest(header, ["a" * 20, "b" * 20], footer)
+    if len(messages) == 1:
+        r.ok("Blocs courts → un seul message")
+    else:
+        r.fail("Blocs courts → un message", f"Messages: {messages}")
+
+
+# ─── TEST 11: Requêtes en vol partagées et pacing ────────────────────────────
+
+def test_requetes_en_vol(r: TestResults):
+    print("\n[TEST 11] Requêtes en vol partagées et pacing")
+
+    # Erreur de l'appel d'origine → transmise aux appels en attente
+    async def erreur_partagee():
+        client = OddsClient("test_key", request_delay=0.01)
+        release = asyncio.Event()
+
+        async def refresh(*args):
+            await release.wait()
+            raise RuntimeError("boom")
+
+        client._refresh = AsyncMock(side_effect=refresh)
+        tasks = [asyncio.create_task(client._request("sports")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return results, client._refresh.await_count
+
+    results, calls = asyncio.run(erreur_partagee())
+    if calls == 1 and all(isinstance(e, RuntimeError) and str(e) == "boom" for e in results):
+        r.ok("Erreur de l'appel d'origine reçue par les appels en attente")
+    else:
+        r.fail("Erreur transmise aux appels en attente", f"Appels: {calls}, résultats: {results}")
+
+    # Appel d'origine annulé → un appel en attente relance la requête
+    async def origine_annulee():
+        client = OddsClient("test_key", request_delay=0.01)
+        response = OddsResponse(success=True, status_code=200)
+        blocked = asyncio.Event()
+
+        async def refresh(*args):
+            if client._refresh.await_count == 1:
+                await blocked.wait()  # Jamais libéré : l'appel d'origine sera annulé
+            return response
+
+        client._refresh = AsyncMock(side_effect=refresh)
+        leader = asyncio.create_task(client._request("sports"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(client._request("sports"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await asyncio.wait_for(waiter, timeout=1)
+        return leader.cancelled(), result is response, client._refresh.await_count, client._inflight
+
+    cancelled, same, calls, inflight = asyncio.run(origine_annulee())
+    if cancelled and same and calls == 2 and not inflight:
+        r.ok("Appel d'origine annulé → requête relancée par l'appel en attente")
+    else:
+        r.fail("Annulation de l'appel d'origine",
+               f"Annulé: {cancelled}, réponse: {same}, appels: {calls}, en vol: {inflight}")
+
+    # 429 + Retry-After numérique → limiteur suspendu ; valeur invalide ignorée
+    client = OddsClient("test_key", request_delay=0.01)
+    client._adapt_pacing(429, -1, {"Retry-After": "30"})
+    paused = client._limiter._paused_until - time.monotonic()
+    if 29 < paused <= 30:
+        r.ok("429 + Retry-After: 30 → limiteur suspendu 30s")
+    else:
+        r.fail("429 + Retry-After → pause", f"Pause restante: {paused:.1f}s")
+
+    client = OddsClient("test_key", request_delay=0.01)
+    client._adapt_pacing(429, -1, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    if client._limiter._paused_until == 0.0:
+        r.ok("Retry-After non numérique → pas de pause")
+    else:
+        r.fail("Retry-After non numérique → pas de pause", f"Pause: {client._limiter._paused_until}")
+
+    # Pause puis reprise : l'acquisition en attente est débloquée sans attendre la fin
+    async def pause_reprise():
+        limiter = AsyncLimiter(100, 1.0)
+        limiter.pause(60)
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not task.done()
+        limiter.resume()
+        await asyncio.wait_for(task, timeout=1)
+        return blocked
+
+    if asyncio.run(pause_reprise()):
+        r.ok("Limiteur suspendu puis repris → acquisition débloquée")
+    else:
+        r.fail("Pause du limiteur", "acquire() n'a pas attendu pendant la pause")
+
+
 # ─── MAIN ────────────────────────────────────────────────────────────────────
 
 def main():
@@ -342,6 +592,11 @@ def main():
     test_deduplication_spreads_multilignes(r)
     test_nouveaux_creneaux_scheduler(r)
     test_scheduler_creneaux(r)
+    test_quota_erreur_reseau(r)
+    test_aimd_concurrence(r)
+    test_cache_lru(r)
+    test_digest_decoupage(r)
+    test_requetes_en_vol(r)
 
     success = r.summary()
     sys.exit(0 if success else 1)
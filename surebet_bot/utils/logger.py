@@ -1,12 +1,36 @@
 # Logging avec rotation quotidienne
 
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 import sys
 
+# Listener unique qui écrit les logs depuis un thread dédié
+_listener: QueueListener | None = None
+
+
+def _stop_listener():
+    """Vide la queue et arrête le thread d'écriture des logs."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
 def setup_logger(log_file: Path, level: int = logging.INFO) -> logging.Logger:
-    """Configure le logger avec rotation quotidienne."""
+    """Configure le logger avec rotation quotidienne.
+    
+    Les modules loggent via des loggers enfants ("surebet_bot.xxx").
+    Le logger principal ne fait que pousser les records dans une queue :
+    l'écriture fichier/console se fait dans le thread du QueueListener,
+    hors de la boucle asyncio.
+    """
+    global _listener
     
     logger = logging.getLogger("surebet_bot")
     logger.setLevel(level)
@@ -33,9 +57,18 @@ def setup_logger(log_file: Path, level: int = logging.INFO) -> logging.Logger:
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
     
-    # Ajouter les handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Remplacer une éventuelle configuration précédente
+    _stop_listener()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    
+    # Les I/O réelles (fichier + console) se font dans le thread du listener
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
     
     return logger
 